@@ -3,634 +3,404 @@ When this code was created only God and I knew how it works, now only God knows.
 
 GoodLuck and may the force be with you.
 """
-from os import path
-import re
-import json
-import datetime
-import requests
-import numpy as np
-import pandas as pd
-from pyquery import PyQuery as pq
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .portfolio import Portfolio
-from .common import brokers, BrokerNotSupportedException,convert_to_numeric_columns, SessionException
+from .analytics import option_chain, bond_analytics, RepoCurve
+from .common import maps, parsers, payloads, records, columnar, changed_rows, ResponseCache, Transport, HistoryStore, Instrumentation, SessionStore, QuoteBook, MarkToMarket, SessionException
+from .common import brokers, BrokerNotSupportedException, convert_to_numeric_columns
+from .common.session_store import session_key, load_cookies
+from .common.instrumentation import timed, decode, bind
+
+# Names re-exported by the package, as before the split into SHDA.common
+__all__ = ['SHDA', 'Portfolio', 'brokers', 'BrokerNotSupportedException', 'convert_to_numeric_columns', 'SessionException']
 
 
 
 class SHDA:
-    __settlements_int_map = {
-        '1': 'spot',
-        '2': '24hs',
-        '3': '48hs'}
-
-    __personal_portfolio_index = ['symbol', 'settlement']
-    __personal_portfolio_columns = ['symbol', 'settlement', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'expiration', 'strike', 'kind', 'underlying_asset', 'close']
-    __empty_personal_portfolio = pd.DataFrame(columns=__personal_portfolio_columns).set_index(__personal_portfolio_index)
-
-    __repos_index = ['symbol', 'settlement']
-    __repos_columns = ['symbol', 'days', 'settlement', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'close']
-    __empty_repos = pd.DataFrame(columns=__repos_columns).set_index(__repos_index)
-
-
-    __call_put_map = {
-            0: '',
-            1: 'CALL',
-            2: 'PUT'}
-    __boards = {
-            0:"",
-            'accionesLideres':'bluechips',
-            'panelGeneral':'general_board',
-            'cedears': 'cedears',
-            'rentaFija':'government_bonds',
-            'letes':'short_term_government_bonds',
-            'obligaciones':'corporate_bonds'}
-
-    __settlements_map = {'':0,'spot': 1,'24hs': 2,'48hs': 3}
-    __securities_columns = ['symbol', 'settlement', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'group']
-    __filter_columns = ['Symbol', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'Panel']
-    __numeric_columns = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close']
-    __numeric_columns_sp = ['last', 'high', 'low','change']
-    __filter_columns_sp = ['Symbol', 'LastPrice', 'VariationRate', 'MaxPrice', 'MinPrice', 'Panel']
-    __sp_columns=['symbol','last','change','high','low','group']
-    
-    def __init__(self,broker,dni,user,password):
-        self.__s = requests.session()
-        self.__host = self.__get_broker_data(broker)['page']
+    __snapshot_panels = maps.snapshot_panels
+    __snapshot_settled_panels = maps.snapshot_settled_panels
+
+    def __init__(self,broker,dni,user,password,cache_ttls=None,cache_size=256,transport=None,history_store=None,instrumentation=None,session_store=None,validate_session=True,quote_book=None,holdings_store=None,mark_to_market=None):
+        self.__t = transport if transport is not None else Transport()
+        self.__history_store = HistoryStore(history_store) if isinstance(history_store, str) else history_store
+        self.__s = self.__t.session
+        self.__cache = ResponseCache(cache_ttls, cache_size)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self.quote_book = QuoteBook() if quote_book is True else quote_book if quote_book is not False else None
+        self.mark_to_market = MarkToMarket() if mark_to_market is True else mark_to_market if mark_to_market is not False else None
+        self.repo_curve = RepoCurve()
+        self.__symbol_panels = {}
+        self.__panel_sizes = {}
+        self.__last_bars = {}
+        broker_data = payloads.get_broker_data(broker)
+        self.__host = broker_data['page']
+        self.__scheme = broker_data.get('scheme', 'https')
+        self.__url = payloads.base_url(broker_data)
         self.__is_user_logged_in = False
+        self.__session_store = SessionStore(session_store) if isinstance(session_store, str) else session_store
+        self.__session_key = session_key(self.__host, dni, user)
 
-        headers = {
-            "Host" : f"{self.__host}",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Accept-Encoding" : "gzip, deflate",
-            "DNT" : "1",    
-            "Connection" : "keep-alive",    
-            "Upgrade-Insecure-Requests" : "1",
-            "Sec-Fetch-Dest" : "document",
-            "Sec-Fetch-Mode" : "navigate",
-            "Sec-Fetch-Site" : "none",
-            "Sec-Fetch-User" : "?1"   
-        }
-
-
-        response = self.__s.get(url = f"https://{self.__host}", headers=headers)
-        status = response.status_code
-        if status != 200:
-          print("Server Down", status)  
-          exit()
-
-        headers = {
-            "Host" : f"{self.__host}",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Accept-Encoding" : "gzip, deflate",
-            "Content-Type" : "application/x-www-form-urlencoded",
-            "Origin" : f"https://{self.__host}/",
-            "DNT" : "1",    
-            "Connection" : "keep-alive",
-            "Referer" : f"https://{self.__host}/",
-            "Upgrade-Insecure-Requests" : "1",
-            "Sec-Fetch-Dest" : "document",
-            "Sec-Fetch-Mode" : "navigate",
-            "Sec-Fetch-Site" : "same-origin",
-            "Sec-Fetch-User" : "?1",
-            "TE" : "trailers"
-        }
-
-        data = {
-            "IpAddress": "",
-            "Dni": dni,
-            "Usuario": user,
-            "Password": password
-        }  
+        headers = payloads.login_headers(self.__host)
+        self.__login_data = payloads.login_data(dni, user, password)
 
-        try:
-            response = self.__s.post(url = f"https://{self.__host}/Login/Ingresar", headers=headers, data = data, allow_redirects=True)
+        with self.instrumentation.call('login', 'Login/Ingresar'):
+            if not self.__restore_session(validate_session):
+                self.__login()
 
-            response.raise_for_status()
+        print("Connected!")
+        self.__is_user_logged_in = True
 
-            doc = pq(response.text)
-            if not doc('#usuarioLogueado'):
-                print("Check login credentials")
-                errormsg = doc('.callout-danger')
-                if errormsg:
-                    raise SessionException(errormsg.text())
+        # From now on a rejected session logs in again once and resends the request
+        self.__t.authenticate = self.__login
 
-                raise SessionException('Session cannot be created.  Check the entered information and try again.')
+        self.get_portfolio= Portfolio(host=self.__host,session=self.__s,headers=headers,transport=self.__t,scheme=self.__scheme,instrumentation=self.instrumentation,holdings_store=holdings_store)
 
-            print("Connected!")
-            self.__is_user_logged_in = True
-        except Exception as ex:
-            self.__is_user_logged_in = False
-            exit()
 
-        self.get_portfolio= Portfolio(host=self.__host,session=self.__s,headers=headers)
-        
+    def get_bluechips(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_bluechips', 'accionesLideres', self.__parser('securities', backend, settlement), settlement, max_age)
 
-    def get_bluechips(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"accionesLideres","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
+    def get_galpones(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_galpones', 'panelGeneral', self.__parser('securities', backend, settlement), settlement, max_age)
 
-    def get_galpones(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"panelGeneral","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
+    def get_cedear(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_cedear', 'cedears', self.__parser('securities', backend, settlement), settlement, max_age)
 
-    def get_cedear(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"cedears","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
+    def get_bonds(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_bonds', 'rentaFija', self.__parser('securities', backend, settlement), settlement, max_age)
 
-    def get_bonds(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"rentaFija","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
+    def get_short_term_bonds(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_short_term_bonds', 'letes', self.__parser('securities', backend, settlement), settlement, max_age)
 
-    def get_short_term_bonds(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"letes","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
-
-    def get_corporate_bonds(self,settlement):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"obligaciones","term":"'+str(self.__settlements_map[settlement])+'"}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df = df[self.__filter_columns].copy()
-        df.columns = self.__securities_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns)
-        df.group = df.group.apply(lambda x: self.__boards[x] if x in self.__boards else self.__boards[0])
-        df.settlement=settlement 
-        return df
+    def get_corporate_bonds(self,settlement,max_age=None,backend='pandas'):
+        return self.__by_panel('get_corporate_bonds', 'obligaciones', self.__parser('securities', backend, settlement), settlement, max_age)
 
     def account(self,comitente):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-
-        payload = {'comitente': str(comitente),
-            'consolida': '0',
-            'proceso': '22',
-            'fechaDesde': None,
-            'fechaHasta': None,
-            'tipo': None,
-            'especie': None,
-            'comitenteMana': None}
-
-        portfolio = self.__s.post(f"https://{self.__host}/Consultas/GetConsulta",json=payload).json()
-        portfolio = portfolio["Result"]["Activos"]
-        detailColumns=["IMPO",	"ESPE",	"TESP",	"NERE",	"GTOS",	"DETA",	"TIPO"	,"Hora"	,"AMPL"	,"DIVI"	,"TICK"	,"CANT"	,"PCIO"	,"CAN3"	,"CAN2","CAN0"]
-        RowOne=["IMPO",	"ESPE",	"TESP",	"NERE",	"GTOS",	"DETA",	"TIPO"	,"Hora"	,"AMPL"	,"DIVI"	,"TICK"	,"CANT"	,"PCIO"	,"CAN3"	,"CAN2","CAN0"]
-
-        df=pd.DataFrame(portfolio)
-        df2=pd.DataFrame(columns=detailColumns)
-        df2.at[0,"IMPO"]=df.at[0,"IMPO"]
-        df2.at[0,"ESPE"]="Cash"
-        if len(df)>0:
-            for i in range(1,len(df)):
-                df2=pd.concat([df2, pd.DataFrame(df.at[i,"Subtotal"])])
-        return df2
-
-    def get_options(self):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"opciones","term":"''"}'
-
-        _filter_columns = ['Symbol', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'MaturityDate', 'StrikePrice', 'PutOrCall', 'Issuer']
-        _numeric_columns = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close', 'strike']
-        _options_columns = ['symbol', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'expiration', 'strike', 'kind', 'underlying_asset']
-
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = pd.DataFrame(data['Result']['Stocks']) if data['Result'] and data['Result']['Stocks'] else pd.DataFrame()
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-
-        if not df.empty:
-            df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-            df.MaturityDate = pd.to_datetime(df.MaturityDate, format='%Y%m%d', errors='coerce')
-            df.PutOrCall = df.PutOrCall.apply(lambda x: self.__call_put_map[x] if x in self.__call_put_map else self.__call_put_map[0])
-
-            df = df[_filter_columns].copy()
-            df.columns = _options_columns
-
-            df = convert_to_numeric_columns(df, _numeric_columns)
-            df = df[df.strike > 0].copy() # Remove non options rows
+        self.__check_login()
 
-        else:
-            df = pd.DataFrame(columns=_options_columns).set_index(['symbol'])
+        with self.instrumentation.call('account', 'Consultas/GetConsulta'):
+            portfolio = self.__get_account(comitente)
+            with timed('build'):
+                return parsers.parse_account(portfolio)
+
+    def iter_account(self,comitente):
+        # Same rows as account(), one dict at a time, without building the DataFrame
+        self.__check_login()
+
+        with self.instrumentation.call('iter_account', 'Consultas/GetConsulta'):
+            portfolio = self.__get_account(comitente)
+        return records.iter_account(portfolio)
+
+    def accounts(self, comitentes, max_workers=8):
+        self.__check_login()
+
+        comitentes = list(comitentes)
+        with self.instrumentation.call('accounts', 'Consultas/GetConsulta'):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(comitentes)))) as executor:
+                frames = list(executor.map(bind(self.account), comitentes))
+
+            with timed('build'):
+                return parsers.concat_by_comitente(frames, comitentes)
+
+    def get_options(self,max_age=None,backend='pandas'):
+        return self.__by_panel('get_options', 'opciones', self.__parser('options', backend), max_age=max_age)
+
+    def get_option_analytics(self, rate, settlement='48hs', max_age=None, price='mid', dividend_yield=0.0, now=None):
+        self.__check_login()
+
+        # The chain and the boards of its underlyings are fetched together
+        with self.instrumentation.call('get_option_analytics', 'Prices/GetByPanel'):
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                options = executor.submit(bind(self.get_options), max_age)
+                underlyings = [executor.submit(bind(method), settlement, max_age) for method in (self.get_bluechips, self.get_galpones)]
+                options = options.result()
+                underlyings = [future.result() for future in underlyings]
+
+            with timed('compute'):
+                return option_chain(options, underlyings, rate, now=now, price=price, dividend_yield=dividend_yield)
+
+    def get_bond_analytics(self, cashflows, settlement, max_age=None, price='last', adjustment=None, today=None):
+        self.__check_login()
+
+        methods = (self.get_bonds, self.get_short_term_bonds, self.get_corporate_bonds)
+        with self.instrumentation.call('get_bond_analytics', 'Prices/GetByPanel'):
+            with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+                frames = [future.result() for future in [executor.submit(bind(method), settlement, max_age) for method in methods]]
+
+            with timed('build'):
+                bonds = parsers.concat_securities(frames)
+            with timed('compute'):
+                return bond_analytics(bonds, cashflows, today=today, price=price, adjustment=adjustment)
+
+    def get_MERVAL(self,max_age=None,backend='pandas'):
+        return self.__by_panel('get_MERVAL', 'indices', self.__parser('indices', backend), max_age=max_age)
+
+    def get_personal_portfolio(self,max_age=None,backend='pandas'):
+        self.__check_login()
+
+        parse = self.__parser('personal_portfolio', backend)
+        with self.instrumentation.call('get_personal_portfolio', 'Prices/GetFavoritos'):
+            data = self.__cache.get('GetFavoritos', None, self.__get_favorites, max_age)
+            with timed('build'):
+                return parse(data)
+
+    def get_repos(self,max_age=None,backend='pandas'):
+        return self.__by_panel('get_repos', 'cauciones', self.__parser('repos', backend), max_age=max_age)
+
+    def get_repo_curve(self,max_age=None):
+        # Every poll updates the same curve, rebuilding only the currencies that changed
+        with self.instrumentation.call('get_repo_curve', 'Prices/GetByPanel', 'cauciones'):
+            repos = self.get_repos(max_age=max_age)
+            with timed('compute'):
+                self.repo_curve.update(repos)
+            return self.repo_curve
+
+    def get_market_snapshot(self, settlement, panels=None, max_workers=None, max_age=None, backend='pandas'):
+        self.__check_login()
+
+        panels = list(self.__snapshot_panels) if panels is None else list(panels)
+        unknown_panels = [panel for panel in panels if panel not in self.__snapshot_panels]
+        if unknown_panels:
+            raise ValueError('Panels not supported: {}. Panels supported: {}.'.format(', '.join(unknown_panels), ', '.join(self.__snapshot_panels)))
+
+        self.__check_backend(backend)
+
+        if not panels:
+            return self.__build_snapshot([], backend)
+
+        # Every panel is an independent GetByPanel call over the same session,
+        # so the whole market costs roughly one round trip instead of nine.
+        with self.instrumentation.call('get_market_snapshot', 'Prices/GetByPanel'):
+            with ThreadPoolExecutor(max_workers=max_workers or len(panels)) as executor:
+                futures = [executor.submit(bind(self.__get_snapshot_panel), panel, settlement, max_age, backend) for panel in panels]
+                frames = [future.result() for future in futures]
+
+            with timed('build'):
+                return self.__build_snapshot(frames, backend)
+
+    def stream(self, panels=None, settlement='48hs', interval=5, columns=None, max_polls=None):
+        # Polls GetByPanel every interval seconds and yields only the rows,
+        # keyed by (symbol, settlement), whose quote changed since the last poll.
+        columns = maps.stream_columns if columns is None else columns
+        previous = None
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            started = time.monotonic()
+            df = self.get_market_snapshot(settlement, panels=panels)
+            changed, previous = changed_rows(df, previous, maps.stream_index, columns)
+            polls += 1
+            if not changed.empty:
+                yield changed.reset_index(drop=True)
+            if max_polls is None or polls < max_polls:
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+
+    def get_daily_history(self, symbol, from_date, to_date, max_age=None, backend='pandas'):
+        self.__check_login()
+
+        parse = self.__parser('daily_history', backend)
+        with self.instrumentation.call('get_daily_history', 'HistoricoPrecios/history'):
+            if self.__history_store is None:
+                return self.__download_daily_history(symbol, from_date, to_date, max_age, parse)
+
+            # Past daily bars never change: only the span missing from the store is downloaded
+            frames = [self.__download_daily_history(symbol, span_from, span_to, max_age, parsers.parse_daily_history) for span_from, span_to in self.__history_store.missing_spans(symbol, from_date, to_date)]
+            with timed('build'):
+                df = self.__history_store.update(symbol, frames, from_date, to_date)
+                return df if backend == 'pandas' else columnar.from_pandas(df, backend)
+
+    def get_daily_history_many(self, symbols, from_date, to_date, max_workers=8, max_age=None, backend='pandas'):
+        self.__check_login()
+
+        self.__check_backend(backend)
+        symbols = [symbol.upper() for symbol in symbols]
+        frames_backend = 'pandas' if backend == 'pandas' else 'columns'
+        with self.instrumentation.call('get_daily_history_many', 'HistoricoPrecios/history'):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols) or 1))) as executor:
+                frames = list(executor.map(bind(lambda symbol: self.get_daily_history(symbol, from_date, to_date, max_age, frames_backend)), symbols))
+
+            with timed('build'):
+                if backend == 'pandas':
+                    return parsers.concat_daily_history(frames, symbols)
+                return columnar.build(records.concat_columns(frames, ['date', 'open', 'high', 'low', 'close', 'volume'], symbols, 'symbol'), backend)
+
+    def get_intraday_history(self, symbol, resolution=1, since=None, to=None, max_age=None, backend='pandas'):
+        self.__check_login()
+
+        resolution = payloads.intraday_resolution(resolution)
+        parse = self.__parser('intraday_history', backend)
+        key = (symbol.upper(), resolution)
+        with self.instrumentation.call('get_intraday_history', 'HistoricoPrecios/history'):
+            # Without since, the request starts at the last bar returned for
+            # the symbol and resolution (it may still be forming), or at the
+            # start of the market day, so polling only downloads new bars
+            if since is None:
+                since = self.__last_bars.get(key) or payloads.market_day_start()
+            url = payloads.history_url(self.__host, symbol, since, int(time.time()) if to is None else to, resolution, self.__scheme)
+            data = self.__cache.get('history', url, lambda: self.__get_history(url), max_age)
+            if data.get('t'):
+                self.__last_bars[key] = max(self.__last_bars.get(key, 0), int(data['t'][-1]))
+            with timed('build'):
+                return parse(data)
+
+    def get_quotes(self, symbols, settlement, max_age=None, max_workers=None, backend='pandas'):
+        self.__check_login()
+
+        symbols = list(dict.fromkeys(symbols))
+        parse = self.__parser('securities', backend, settlement)
+        with self.instrumentation.call('get_quotes', 'Prices/GetByPanel'):
+            # Only the boards holding the symbols are downloaded. Symbols not
+            # indexed yet are looked for in the boards never seen before.
+            panels = {self.__symbol_panels[symbol] for symbol in symbols if symbol in self.__symbol_panels}
+            if any(symbol not in self.__symbol_panels for symbol in symbols):
+                panels.update(panel for panel in self.__snapshot_settled_panels if panel not in self.__panel_sizes)
+            panels = [panel for panel in self.__snapshot_settled_panels if panel in panels]
+
+            with ThreadPoolExecutor(max_workers=max_workers or max(1, len(panels))) as executor:
+                responses = list(executor.map(bind(lambda panel: self.__get_by_panel(panel, settlement, max_age)), panels))
+
+            # One row per symbol, from the board it is indexed in, in the requested order
+            wanted = {symbol: i for i, symbol in enumerate(symbols)}
+            stocks = {}
+            for panel, data in zip(panels, responses):
+                for stock in records.board_stocks(data):
+                    symbol = stock.get('Symbol')
+                    if symbol in wanted and symbol not in stocks and self.__symbol_panels.get(symbol, panel) == panel:
+                        stocks[symbol] = stock
+            stocks = sorted(stocks.values(), key=lambda stock: wanted[stock['Symbol']])
+            with timed('build'):
+                return parse({'Result': {'Stocks': stocks}})
+
+    def clear_cache(self):
+        self.__cache.clear()
+        self.__symbol_panels.clear()
+        self.__panel_sizes.clear()
+        self.__last_bars.clear()
 
-        return df
 
-    def get_MERVAL(self):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"indices","term":""}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel", headers=headers, data = data)
-        status = response.status_code
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-        df = df[self.__filter_columns_sp].copy()
-        df.columns = self.__sp_columns
-        df = convert_to_numeric_columns(df, self.__numeric_columns_sp)
-        return df
-
-    def get_personal_portfolio(self):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"indices","term":""}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetFavoritos", headers=headers)
-        status = response.status_code
-
-        data = response.json()
-        data = pd.DataFrame(data['Result'])
-
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-
-        df = pd.DataFrame(data)
-        if df.empty:
-            return self.__empty_personal_portfolio.copy()
-
-        filter_columns = ['Symbol', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'MaturityDate', 'StrikePrice', 'PutOrCall', 'Issuer', 'ClosePrice']
-        numeric_columns = ['last', 'close', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close', 'strike']
-        numeric_options_columns = ['MaturityDate', 'StrikePrice']
-        alpha_option_columns = ['PutOrCall', 'Issuer']
-
-        df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-        df.loc[df.StrikePrice == 0, alpha_option_columns] = ''
-        df.loc[df.StrikePrice == 0, numeric_options_columns] = np.nan
-        df.MaturityDate = pd.to_datetime(df.MaturityDate, format='%Y%m%d', errors='coerce')
-        df.PutOrCall = df.PutOrCall.apply(lambda x: self.__call_put_map[x] if x in self.__call_put_map else self.__call_put_map[0])
-        df.Term = df.Term.apply(lambda x: self.__settlements_int_map[x] if x in self.__settlements_int_map else '')
-        df = df[filter_columns].copy()
-        df.columns = self.__personal_portfolio_columns
-        df = convert_to_numeric_columns(df, numeric_columns)
-        return df
-    
-    def get_repos(self):
+    #########################
+    #### PRIVATE METHODS ####
+    #########################
+    def __check_login(self):
         if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-        headers = {
-            "Accept" : "application/json, text/javascript, */*; q=0.01",
-            "Accept-Encoding" : "gzip, deflate",
-            "Accept-Language" : "en-US,en;q=0.5",
-            "Connection" : "keep-alive",    
-            "Content-Type" : "application/json; charset=utf-8",
-            "DNT" : "1",    
-            "Host" : f"{self.__host}",
-            "Origin" : f"https://{self.__host}",
-            "Referer" : f"https://{self.__host}/Prices/Stocks",
-            "Sec-Fetch-Dest" : "empty",
-            "Sec-Fetch-Mode" : "cors",
-            "Sec-Fetch-Site" : "same-origin",
-            "TE" : "trailers",
-            "User-Agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            "X-Requested-With" : "XMLHttpRequest"
-        }
-
-        data = '{"panel":"cauciones","term":""}'
-        response = self.__s.post(url = f"https://{self.__host}/Prices/GetByPanel",data=data ,headers=headers)
-        status = response.status_code
-
-
-        data = response.json()
-        df = pd.DataFrame(data['Result']['Stocks'])
-
-        if status != 200:
-            print("GetByPanel", status)  
-            exit()
-
-        filter_columns = ['Symbol', 'CantDias', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'ClosePrice']
-        numeric_columns = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount', 'previous_close', 'close']
-
-        if not df.empty:
-            df.TradeDate = pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
-
-            df = df[filter_columns].copy()
-            df.columns = self.__repos_columns
-
-            df = convert_to_numeric_columns(df, numeric_columns)
-            df = df.set_index(self.__repos_index)
-        else:
-            df = self.__empty_repos.copy()
+            raise SessionException('You must be logged first')
 
-        return df
-    
-    def get_daily_history(self, symbol, from_date, to_date):
-        if not self.__is_user_logged_in:
-            print('You must be logged first')
-            exit()
-
-        headers = {
-            'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            'Accept-Encoding': 'gzip, deflate',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-
-        url = 'https://{}/HistoricoPrecios/history?symbol={}&resolution=D&from={}&to={}'.format(
-            self.__host,
-            symbol.upper(),
-            self.__convert_datetime_to_epoch(from_date),
-            self.__convert_datetime_to_epoch(to_date))
-
-        resp = self.__s.get(url = url ,headers=headers)
-        resp.raise_for_status()
-        resp = resp.json()
-        df = pd.DataFrame({'date': resp['t'], 'open': resp['o'], 'high': resp['h'], 'low': resp['l'], 'close': resp['c'], 'volume': resp['v']})
-        df.date = pd.to_datetime(df.date, unit='s').dt.date
-        df.volume = df.volume.astype(int)
+    def __login(self):
 
-        return df
-    
+        self.__s.cookies.clear()
+        self.__t.get(self.__url, headers=payloads.home_headers(self.__host), reauthenticate=False)
+        response = self.__t.post(f"{self.__url}/Login/Ingresar", headers=payloads.login_headers(self.__host), data = self.__login_data, allow_redirects=True, reauthenticate=False)
 
-    #########################
-    #### PRIVATE METHODS ####
-    #########################
-    def __convert_datetime_to_epoch(self, dt):
+        errormsg = payloads.check_login(response.text)
+        if errormsg:
+            raise SessionException(errormsg)
 
-        if isinstance(dt, str):
-            dt = datetime.datetime.strptime(dt, '%Y-%m-%d')
+        if self.__session_store is not None:
+            self.__session_store.save(self.__session_key, self.__s.cookies)
 
-        dt_zero = datetime.date(1970, 1, 1)
-        time_delta = dt - dt_zero
-        return int(time_delta.total_seconds())
-    
-    def __get_broker_data(self, broker_id):
+    def __restore_session(self, validate):
 
-        broker_data = [broker for broker in brokers if broker['broker_id'] == broker_id]
+        cookies = self.__session_store.load(self.__session_key) if self.__session_store is not None else None
+        if not cookies or not load_cookies(self.__s.cookies, cookies):
+            return False
+        if not validate:
+            return True
 
-        if not broker_data:
-            supported_brokers = ''.join([str(broker['broker_id']) + ', ' for broker in brokers])[0:-2]
-            raise BrokerNotSupportedException('Broker not supported.  Brokers supported: {}.'.format(supported_brokers))
+        # One GET of the home page instead of the GET plus login POST
+        try:
+            response = self.__t.get(self.__url, headers=payloads.home_headers(self.__host), reauthenticate=False)
+        except SessionException:
+            return False
+        return payloads.check_login(response.text) is None
+
+    def __check_backend(self, backend):
+        if backend != 'pandas' and backend not in columnar.backends:
+            raise ValueError("Backend not supported: {}. Backends supported: pandas, {}.".format(backend, ', '.join(columnar.backends)))
+
+    def __parser(self, kind, backend, settlement=None):
+        # Returns parse(data) for a decoded response of kind, built with
+        # parsers.parse_<kind> for pandas or from the pure Python column
+        # lists of records.<kind>_columns for every other backend.
+
+        if backend == 'pandas':
+            parse = getattr(parsers, 'parse_' + kind)
+        elif backend == 'records' and kind == 'securities':
+            # Quote namedtuples built in pure Python, pandas is not imported
+            parse = records.parse_quotes
+        elif backend in columnar.backends or backend == 'columns':
+            columns = getattr(records, kind + '_columns')
+            parse = lambda data, *args: columnar.build(columns(data, *args), backend)
+        else:
+            supported = ['pandas'] + (['records'] if kind == 'securities' else []) + list(columnar.backends)
+            raise ValueError("Backend not supported: {}. Backends supported: {}.".format(backend, ', '.join(supported)))
+
+        return (lambda data: parse(data, settlement)) if kind == 'securities' else parse
+
+    def __by_panel(self, method, panel, parse, settlement=None, max_age=None):
+
+        with self.instrumentation.call(method, 'Prices/GetByPanel', panel):
+            data = self.__get_by_panel(panel, settlement, max_age)
+            with timed('build'):
+                return parse(data)
+
+    def __get_by_panel(self, panel, settlement=None, max_age=None):
+        self.__check_login()
+
+        data = payloads.panel_data(panel, settlement)
+        return self.__cache.get('GetByPanel', data, lambda: self.__post_by_panel(data, panel, settlement), max_age)
+
+    def __post_by_panel(self, data, panel=None, settlement=None):
+        # GetByPanel is a read only query, safe to retry
+        response = decode(self.__t.post(f"{self.__url}/Prices/GetByPanel", headers=payloads.prices_headers(self.__host), data = data, idempotent=True))
+        if panel in self.__snapshot_settled_panels:
+            self.__index_symbols(panel, records.board_stocks(response))
+        if self.quote_book is not None:
+            with timed('build'):
+                self.quote_book.update(response, settlement)
+        if self.mark_to_market is not None:
+            with timed('build'):
+                self.mark_to_market.update(response, settlement, panel)
+        return response
+
+    def __index_symbols(self, panel, stocks):
+        # A symbol listed in several boards is kept in the smallest one
+        self.__panel_sizes[panel] = size = len(stocks)
+        for stock in stocks:
+            symbol = stock.get('Symbol')
+            current = self.__symbol_panels.get(symbol)
+            if current is None or current == panel or size < self.__panel_sizes.get(current, 0):
+                self.__symbol_panels[symbol] = panel
+
+    def __get_account(self, comitente):
+        return decode(self.__t.post(f"{self.__url}/Consultas/GetConsulta",json=payloads.account_data(comitente),idempotent=True))
+
+    def __get_favorites(self):
+        return decode(self.__t.post(f"{self.__url}/Prices/GetFavoritos", headers=payloads.prices_headers(self.__host), idempotent=True))
+
+    def __get_history(self, url):
+        return decode(self.__t.get(url, headers=payloads.history_headers()))
+
+    def __download_daily_history(self, symbol, from_date, to_date, max_age=None, parse=parsers.parse_daily_history):
+
+        url = payloads.history_url(self.__host, symbol, from_date, to_date, scheme=self.__scheme)
+        data = self.__cache.get('history', url, lambda: self.__get_history(url), max_age)
+        with timed('build'):
+            return parse(data)
+
+    def __get_snapshot_panel(self, panel, settlement, max_age=None, backend='pandas'):
+
+        method = getattr(self, self.__snapshot_panels[panel])
+        frame_backend = 'pandas' if backend == 'pandas' else 'columns'
+        df = method(settlement, max_age, frame_backend) if panel in self.__snapshot_settled_panels else method(max_age, frame_backend)
+        if backend == 'pandas':
+            return parsers.snapshot_panel(df, panel)
+
+        df['panel'] = [panel] * len(next(iter(df.values())))
+        df.setdefault('settlement', [''] * len(df['panel']))
+        return df
 
-        return broker_data[0]
+    def __build_snapshot(self, frames, backend):
 
+        if backend == 'pandas':
+            return parsers.parse_snapshot(frames)
+        return columnar.build(records.concat_columns(frames, maps.snapshot_columns), backend)
 
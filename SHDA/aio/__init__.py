@@ -0,0 +1,2 @@
+from .client import AsyncSHDA
+from .portfolio import AsyncPortfolio
@@ -0,0 +1,165 @@
+import asyncio
+import time
+import aiohttp
+from .portfolio import AsyncPortfolio
+from ..common import maps, parsers, payloads, changed_rows, SessionException
+from .transport import request
+
+
+class AsyncSHDA:
+    """
+    asyncio counterpart of SHDA.SHDA built on aiohttp.
+
+    Requests and parsing are shared with the blocking client, so every
+    coroutine returns exactly the same DataFrame as its SHDA namesake.
+
+        async with AsyncSHDA(broker, dni, user, password) as hb:
+            bonds = await hb.get_bonds("48hs")
+    """
+    __snapshot_panels = maps.snapshot_panels
+    __snapshot_settled_panels = maps.snapshot_settled_panels
+
+    def __init__(self, broker, dni, user, password, session=None):
+        broker_data = payloads.get_broker_data(broker)
+        self.__host = broker_data['page']
+        self.__scheme = broker_data.get('scheme', 'https')
+        self.__url = payloads.base_url(broker_data)
+        self.__dni = dni
+        self.__user = user
+        self.__password = password
+        self.__s = session
+        self.__owns_session = session is None
+        self.__is_user_logged_in = False
+        self.get_portfolio = None
+
+    async def __aenter__(self):
+        try:
+            await self.login()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def login(self):
+        if self.__s is None:
+            self.__s = aiohttp.ClientSession()
+
+        await request(self.__s, 'GET', self.__url, text=True, headers=payloads.home_headers(self.__host))
+
+        headers = payloads.login_headers(self.__host)
+        data = payloads.login_data(self.__dni, self.__user, self.__password)
+
+        text = await request(self.__s, 'POST', f"{self.__url}/Login/Ingresar", text=True, headers=headers, data=data, allow_redirects=True)
+
+        errormsg = payloads.check_login(text)
+        if errormsg:
+            self.__is_user_logged_in = False
+            raise SessionException(errormsg)
+
+        self.__is_user_logged_in = True
+        self.get_portfolio = AsyncPortfolio(host=self.__host, session=self.__s, headers=headers, scheme=self.__scheme)
+        return self
+
+    async def close(self):
+        if self.__s is not None and self.__owns_session:
+            await self.__s.close()
+        self.__s = None
+        self.__is_user_logged_in = False
+
+    async def get_bluechips(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('accionesLideres', settlement), settlement)
+
+    async def get_galpones(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('panelGeneral', settlement), settlement)
+
+    async def get_cedear(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('cedears', settlement), settlement)
+
+    async def get_bonds(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('rentaFija', settlement), settlement)
+
+    async def get_short_term_bonds(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('letes', settlement), settlement)
+
+    async def get_corporate_bonds(self, settlement):
+        return parsers.parse_securities(await self.__get_by_panel('obligaciones', settlement), settlement)
+
+    async def account(self, comitente):
+        self.__check_login()
+
+        portfolio = await request(self.__s, 'POST', f"{self.__url}/Consultas/GetConsulta", json=payloads.account_data(comitente))
+
+        return parsers.parse_account(portfolio)
+
+    async def get_options(self):
+        return parsers.parse_options(await self.__get_by_panel('opciones'))
+
+    async def get_MERVAL(self):
+        return parsers.parse_indices(await self.__get_by_panel('indices'))
+
+    async def get_personal_portfolio(self):
+        self.__check_login()
+
+        data = await request(self.__s, 'POST', f"{self.__url}/Prices/GetFavoritos", headers=payloads.prices_headers(self.__host))
+
+        return parsers.parse_personal_portfolio(data)
+
+    async def get_repos(self):
+        return parsers.parse_repos(await self.__get_by_panel('cauciones'))
+
+    async def get_market_snapshot(self, settlement, panels=None):
+        self.__check_login()
+
+        panels = list(self.__snapshot_panels) if panels is None else list(panels)
+        unknown_panels = [panel for panel in panels if panel not in self.__snapshot_panels]
+        if unknown_panels:
+            raise ValueError('Panels not supported: {}. Panels supported: {}.'.format(', '.join(unknown_panels), ', '.join(self.__snapshot_panels)))
+
+        frames = await asyncio.gather(*[self.__get_snapshot_panel(panel, settlement) for panel in panels])
+        return parsers.parse_snapshot(frames)
+
+    async def stream(self, panels=None, settlement='48hs', interval=5, columns=None, max_polls=None):
+        columns = maps.stream_columns if columns is None else columns
+        previous = None
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            started = time.monotonic()
+            df = await self.get_market_snapshot(settlement, panels=panels)
+            changed, previous = changed_rows(df, previous, maps.stream_index, columns)
+            polls += 1
+            if not changed.empty:
+                yield changed.reset_index(drop=True)
+            if max_polls is None or polls < max_polls:
+                await asyncio.sleep(max(0, interval - (time.monotonic() - started)))
+
+    async def get_daily_history(self, symbol, from_date, to_date):
+        self.__check_login()
+
+        url = payloads.history_url(self.__host, symbol, from_date, to_date, scheme=self.__scheme)
+
+        data = await request(self.__s, 'GET', url, headers=payloads.history_headers())
+
+        return parsers.parse_daily_history(data)
+
+
+    #########################
+    #### PRIVATE METHODS ####
+    #########################
+    def __check_login(self):
+        if not self.__is_user_logged_in:
+            raise SessionException('You must be logged first')
+
+    async def __get_by_panel(self, panel, settlement=None):
+        self.__check_login()
+
+        data = payloads.panel_data(panel, settlement)
+        return await request(self.__s, 'POST', f"{self.__url}/Prices/GetByPanel", headers=payloads.prices_headers(self.__host), data=data)
+
+    async def __get_snapshot_panel(self, panel, settlement):
+
+        method = getattr(self, self.__snapshot_panels[panel])
+        df = await (method(settlement) if panel in self.__snapshot_settled_panels else method())
+        return parsers.snapshot_panel(df, panel)
@@ -0,0 +1,43 @@
+from ..common import parsers, payloads
+from .transport import request
+
+class AsyncPortfolio:
+    """
+    Versión asíncrona de Portfolio, comparte el armado del pedido y el procesamiento
+    de la respuesta con la clase sincrónica.
+
+    Atributos:
+        headers (dict): Encabezados HTTP que se utilizan en las solicitudes a la API.
+        host (str): Host o dominio donde se realiza la consulta.
+        session (aiohttp.ClientSession): Sesión HTTP asíncrona ya autenticada.
+    """
+
+    def __init__(self, headers, host, session, scheme="https"):
+        self.__headers = headers
+        self.__host = host
+        self.__url = f"{scheme}://{host}"
+        self.__s = session
+
+    async def by_date(self, comitente, date, moneda):
+        """
+        Obtiene los activos de un comitente en una fecha específica y en una moneda determinada.
+
+        Parámetros:
+            comitente (str): ID del comitente.
+            date (str): Fecha en formato "YYYY-MM-DD" para la consulta.
+            moneda (str): Moneda en la que se requiere obtener los activos ("ARS" o "USD").
+
+        Retorna:
+            pd.DataFrame: DataFrame con los datos procesados de los activos.
+
+        Lanza:
+            ValueError: Si la moneda no es válida o si la fecha no tiene el formato esperado.
+            SessionException: Si el broker rechaza la sesión.
+            ServerException: Si la solicitud falla.
+        """
+
+        payload = payloads.portfolio_by_date_data(comitente, date, moneda)
+
+        portfolio = await request(self.__s, 'POST', f"{self.__url}/Consultas/GetConsulta", json=payload)
+
+        return parsers.parse_portfolio_by_date(portfolio)
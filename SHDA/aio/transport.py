@@ -0,0 +1,26 @@
+from urllib.parse import urlparse
+
+import aiohttp
+
+from ..common import Transport, SessionException, ServerException
+
+
+async def request(session, method, url, text=False, **kwargs):
+    """
+    Sends one aiohttp request and returns its decoded JSON body (or text),
+    with the checks of the blocking Transport: a 401/403 or a redirect to
+    the login page raise SessionException, any other status outside 2xx
+    and connection errors raise ServerException.
+    """
+
+    try:
+        async with session.request(method, url, **kwargs) as response:
+            if response.status in Transport.session_statuses:
+                raise SessionException('Session rejected by the broker ({}).'.format(response.status))
+            if not 200 <= response.status < 300:
+                raise ServerException('{} {}: {}'.format(method, url, response.status))
+            if response.history and Transport.login_path in response.url.path and Transport.login_path not in urlparse(url).path:
+                raise SessionException('Session rejected by the broker (redirected to the login page).')
+            return await (response.text() if text else response.json(content_type=None))
+    except aiohttp.ClientError as ex:
+        raise ServerException('{} {}: {}'.format(method, url, ex)) from ex
@@ -0,0 +1,4 @@
+from . import options, bonds, repos
+from .options import option_chain, implied_volatility, black_scholes, greeks
+from .bonds import CashflowTable, bond_analytics, yield_to_maturity
+from .repos import RepoCurve
@@ -0,0 +1,184 @@
+import datetime
+import threading
+import warnings
+
+from ..common.lazy import LazyModule
+from .solver import safeguarded_newton, quote_prices
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Business days between the trade and its settlement
+settlement_days = {'spot': 0, '24hs': 1, '48hs': 2}
+
+def settlement_dates(settlements, today=None, holidays=()):
+    """Settlement date of every row, counting business days from today."""
+
+    today = np.datetime64(today if today is not None else datetime.date.today(), 'D')
+    days = np.array([settlement_days.get(settlement, 0) for settlement in settlements], dtype=np.int64)
+    return np.busday_offset(today, days, roll='forward', holidays=list(holidays))
+
+
+class CashflowTable:
+    """
+    Cashflows of every bond per 100 of original face value, from a
+    DataFrame (or CSV file) with symbol, date, interest and amortization
+    columns. Besides the future flows, the table must hold the last
+    payment on or before the settlement date (for a bond that has not paid
+    yet, a row with zero flows on its issue date): accrued interest runs
+    from it. Bonds without it get a NaN accrued, technical value and
+    parity, and a RuntimeWarning. The padded flow matrices of a set of
+    symbols and settlement dates are built once and reused until the board
+    changes, so a poll only pays for the yield solve.
+    """
+
+    columns = ['symbol', 'date', 'interest', 'amortization']
+
+    def __init__(self, flows, cache_size=16):
+        if isinstance(flows, str):
+            flows = pd.read_csv(flows)
+
+        flows = flows[self.columns].copy()
+        flows['date'] = pd.to_datetime(flows.date)
+        flows = flows.sort_values(['symbol', 'date'], kind='stable')
+
+        self.__flows = {}
+        for symbol, group in flows.groupby('symbol', sort=False):
+            self.__flows[symbol] = (group.date.to_numpy().astype('datetime64[D]'), group.interest.to_numpy(dtype=np.float64), group.amortization.to_numpy(dtype=np.float64))
+        self.__cache = {}
+        self.__cache_size = cache_size
+        self.__lock = threading.Lock()
+
+    def __contains__(self, symbol):
+        return symbol in self.__flows
+
+    @property
+    def symbols(self):
+        return list(self.__flows)
+
+    def matrices(self, symbols, dates):
+        """
+        Flows and year fractions (ACT/365 from the settlement date) padded
+        to the longest schedule, plus accrued interest and residual face
+        value, for every (symbol, settlement date) row.
+        """
+
+        key = (tuple(symbols), np.asarray(dates, dtype='datetime64[D]').tobytes())
+        with self.__lock:
+            cached = self.__cache.get(key)
+        if cached is not None:
+            return cached
+
+        schedules = []
+        missing = []
+        for symbol, date in zip(symbols, np.asarray(dates, dtype='datetime64[D]')):
+            dates_, interest, amortization = self.__flows.get(symbol, (np.empty(0, dtype='datetime64[D]'), np.empty(0), np.empty(0)))
+            # A flow paid on the settlement date belongs to the seller
+            start = np.searchsorted(dates_, date, side='right')
+            accrued = 0.0
+            if 0 < start < len(dates_):
+                period = (dates_[start] - dates_[start - 1]).astype(np.float64)
+                accrued = interest[start] * (date - dates_[start - 1]).astype(np.float64) / period
+            elif start == 0 and len(dates_):
+                # Without the previous payment the accrual period is unknown
+                accrued = np.nan
+                missing.append(symbol)
+            schedules.append(((dates_[start:] - date).astype(np.float64) / 365, interest[start:] + amortization[start:], accrued, amortization[start:].sum()))
+
+        width = max([len(schedule[0]) for schedule in schedules] + [1])
+        times = np.zeros((len(schedules), width))
+        flows = np.zeros((len(schedules), width))
+        for i, schedule in enumerate(schedules):
+            times[i, :len(schedule[0])] = schedule[0]
+            flows[i, :len(schedule[1])] = schedule[1]
+        accrued = np.array([schedule[2] for schedule in schedules], dtype=np.float64)
+        residual = np.array([schedule[3] for schedule in schedules], dtype=np.float64)
+        if missing:
+            warnings.warn('No cashflow on or before the settlement date for {}: their accrued interest, technical value and parity are NaN. '
+                          'Include the last payment (or the issue date) in the CashflowTable.'.format(', '.join(sorted(set(missing)))), RuntimeWarning)
+
+        result = (times, flows, accrued, residual)
+        with self.__lock:
+            if len(self.__cache) >= self.__cache_size:
+                self.__cache.pop(next(iter(self.__cache)))
+            self.__cache[key] = result
+        return result
+
+def present_value(times, flows, ytm):
+    """Price, dP/dy and d2P/dy2 of every row at its effective annual yield."""
+
+    discount = (1 + ytm[:, None]) ** -times
+    value = (flows * discount).sum(axis=1)
+    first = -(flows * times * discount).sum(axis=1) / (1 + ytm)
+    second = (flows * times * (times + 1) * discount).sum(axis=1) / (1 + ytm) ** 2
+    return value, first, second
+
+def yield_to_maturity(price, times, flows, tol=1e-10, max_iter=100, low=-0.99, high=100.0):
+    """
+    Effective annual yield of every row at once, solving price == present
+    value with a safeguarded Newton. Rows without flows or price are NaN.
+    """
+
+    price = np.asarray(price, dtype=np.float64)
+    total = flows.sum(axis=1)
+    valid = (price > 0) & (total > 0)
+    # A price above the undiscounted flows means a negative yield
+    valid &= ((flows * (1 + low) ** -times).sum(axis=1) > price) & ((flows * (1 + high) ** -times).sum(axis=1) < price)
+
+    ytm = np.full(price.shape, np.nan)
+    if not valid.any():
+        return ytm
+
+    p, t, f = price[valid], times[valid], flows[valid]
+
+    def value(rows, y):
+        pv, first, _ = present_value(t[rows], f[rows], y)
+        return pv - p[rows], first
+
+    # Zero coupon yield over the flow weighted life as starting point
+    life = (f * t).sum(axis=1) / f.sum(axis=1)
+    guess = np.clip((f.sum(axis=1) / p) ** (1 / np.maximum(life, 1 / 365)) - 1, low / 2, high / 2)
+    ytm[valid] = safeguarded_newton(value, guess, low, high, increasing=False, tol=tol, max_iter=max_iter)
+    return ytm
+
+def bond_analytics(bonds, cashflows, today=None, price='last', adjustment=None, holidays=()):
+    """
+    TIR, durations, convexity and parity of every row of a
+    get_bonds/get_short_term_bonds/get_corporate_bonds frame.
+
+    cashflows is a CashflowTable (or what it takes) with the flows per 100
+    of face value the prices are quoted in. adjustment maps a symbol to a
+    factor applied to its flows: the CER coefficient of inflation linked
+    bonds, or the exchange rate of the peso lines of dollar bonds. Returns
+    a copy of the rows with a cashflow schedule and price, ytm,
+    macaulay_duration, modified_duration, convexity, accrued,
+    technical_value and parity columns.
+    """
+
+    if not isinstance(cashflows, CashflowTable):
+        cashflows = CashflowTable(cashflows)
+
+    df = bonds[bonds.symbol.isin(cashflows.symbols)].reset_index(drop=True)
+    dates = settlement_dates(df.settlement, today, holidays)
+    times, flows, accrued, residual = cashflows.matrices(df.symbol.tolist(), dates)
+
+    if adjustment is not None:
+        factor = df.symbol.map(pd.Series(adjustment, dtype=np.float64)).fillna(1).to_numpy()
+        flows = flows * factor[:, None]
+        accrued = accrued * factor
+        residual = residual * factor
+
+    df['price'] = quote_prices(df, price)
+    ytm = yield_to_maturity(df.price.to_numpy(), times, flows)
+    pv, first, second = present_value(times, flows, np.nan_to_num(ytm))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        modified = np.where(np.isnan(ytm), np.nan, -first / pv)
+        df['ytm'] = ytm
+        df['macaulay_duration'] = modified * (1 + ytm)
+        df['modified_duration'] = modified
+        df['convexity'] = np.where(np.isnan(ytm), np.nan, second / pv)
+        df['accrued'] = accrued
+        df['technical_value'] = residual + accrued
+        df['parity'] = df.price.to_numpy() / df.technical_value.to_numpy()
+    return df
@@ -0,0 +1,188 @@
+import datetime
+import math
+
+from ..common.lazy import LazyModule
+from .solver import safeguarded_newton, quote_prices
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# W. J. Cody's rational approximations of erf/erfc (Math. Comp. 23, 1969),
+# evaluated for the whole chain with float64 array arithmetic; relative
+# error below 1e-13, so the implied volatilities do not depend on scipy
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02, 3.20937758913846947e03, 1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03, 2.84423683343917062e03)
+_ERFC_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01, 2.98635138197400131e02, 8.81952221241769090e02,
+           1.71204761263407058e03, 2.05107837782607147e03, 1.23033935479799725e03, 2.15311535474403846e-8)
+_ERFC_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02, 1.62138957456669019e03, 3.29079923573345963e03,
+           4.36261909014324716e03, 3.43936767414372164e03, 1.23033935480374942e03)
+_ERFC_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1, 1.60837851487422766e-2, 6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERFC_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1, 6.05183413124413191e-2, 2.33520497626869185e-3)
+
+def _polynomial(coefficients, x, first):
+    # Horner evaluation of ((first*x + c0)*x + c1)*x ... over an array
+    value = first * x
+    for coefficient in coefficients:
+        value += coefficient
+        value *= x
+    return value
+
+def erfc(x):
+    """Complementary error function of an array, in NumPy only."""
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.abs(x)
+    result = np.empty_like(y)
+
+    # |x| <= 0.46875: erf as a rational function of x**2
+    small = y <= 0.46875
+    xs = x[small]
+    ysq = xs * xs
+    result[small] = 1 - xs * (_polynomial(_ERF_A[:3], ysq, _ERF_A[4]) + _ERF_A[3]) / (_polynomial(_ERF_B[:3], ysq, 1.0) + _ERF_B[3])
+
+    # 0.46875 < |x| <= 4 and |x| > 4: erfc(|x|) = exp(-x**2) * R(|x|)
+    middle = ~small & (y <= 4.0)
+    ym = y[middle]
+    result[middle] = np.exp(-ym * ym) * (_polynomial(_ERFC_C[:7], ym, _ERFC_C[8]) + _ERFC_C[7]) / (_polynomial(_ERFC_D[:7], ym, 1.0) + _ERFC_D[7])
+
+    tail = ~small & ~middle
+    yt = y[tail]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        inv = 1 / (yt * yt)
+        value = (1 / math.sqrt(math.pi) - inv * (_polynomial(_ERFC_P[:4], inv, _ERFC_P[5]) + _ERFC_P[4]) / (_polynomial(_ERFC_Q[:4], inv, 1.0) + _ERFC_Q[4])) / yt
+        result[tail] = np.where(np.isinf(yt), 0.0, np.exp(-yt * yt) * value)
+
+    # erfc(-y) = 2 - erfc(y); NaN stays NaN
+    negative = ~small & (x < 0)
+    result[negative] = 2 - result[negative]
+    return result if result.ndim else result[()]
+
+def norm_cdf(x):
+    return 0.5 * erfc(-np.asarray(x, dtype=np.float64) / math.sqrt(2))
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.square(x)) / math.sqrt(2 * math.pi)
+
+def _d1_d2(spot, strike, years, rate, dividend_yield, volatility):
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * volatility ** 2) * years) / (volatility * sqrt_t)
+    return d1, d1 - volatility * sqrt_t
+
+def black_scholes(spot, strike, years, rate, volatility, is_call, dividend_yield=0.0):
+    """Black-Scholes-Merton price of European options, broadcast over every argument."""
+
+    spot, strike, years, rate, volatility, dividend_yield = (np.asarray(value, dtype=np.float64) for value in (spot, strike, years, rate, volatility, dividend_yield))
+    is_call = np.asarray(is_call, dtype=bool)
+
+    d1, d2 = _d1_d2(spot, strike, years, rate, dividend_yield, volatility)
+    forward = spot * np.exp(-dividend_yield * years)
+    discounted = strike * np.exp(-rate * years)
+    call = forward * norm_cdf(d1) - discounted * norm_cdf(d2)
+    put = discounted * norm_cdf(-d2) - forward * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+def greeks(spot, strike, years, rate, volatility, is_call, dividend_yield=0.0):
+    """
+    Delta, gamma, vega (per 1.00 of volatility) and theta (per calendar
+    day) as a dict of arrays.
+    """
+
+    spot, strike, years, rate, volatility, dividend_yield = (np.asarray(value, dtype=np.float64) for value in (spot, strike, years, rate, volatility, dividend_yield))
+    is_call = np.asarray(is_call, dtype=bool)
+
+    d1, d2 = _d1_d2(spot, strike, years, rate, dividend_yield, volatility)
+    sqrt_t = np.sqrt(years)
+    carry = np.exp(-dividend_yield * years)
+    discount = np.exp(-rate * years)
+    pdf = norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+
+    decay = -spot * carry * pdf * volatility / (2 * sqrt_t)
+    theta = decay - sign * rate * strike * discount * norm_cdf(sign * d2) + sign * dividend_yield * spot * carry * norm_cdf(sign * d1)
+    return {
+        'delta': carry * (norm_cdf(d1) - np.where(is_call, 0.0, 1.0)),
+        'gamma': carry * pdf / (spot * volatility * sqrt_t),
+        'vega': spot * carry * pdf * sqrt_t,
+        'theta': theta / 365}
+
+def implied_volatility(price, spot, strike, years, rate, is_call, dividend_yield=0.0, tol=1e-8, max_iter=100, low=1e-4, high=5.0):
+    """
+    Implied volatility of every option at once.
+
+    Batched Newton on vega, safeguarded by a bisection bracket [low, high]
+    so deep in or out of the money series still converge. Prices outside
+    the no-arbitrage bounds, or with no time left, are NaN.
+    """
+
+    price, spot, strike, years, rate, dividend_yield = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (price, spot, strike, years, rate, dividend_yield)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+
+    forward = spot * np.exp(-dividend_yield * years)
+    discounted = strike * np.exp(-rate * years)
+    lower = np.where(is_call, np.maximum(forward - discounted, 0), np.maximum(discounted - forward, 0))
+    upper = np.where(is_call, forward, discounted)
+    valid = (years > 0) & (spot > 0) & (strike > 0) & (price > lower) & (price < upper)
+
+    volatility = np.full(price.shape, np.nan)
+    if not valid.any():
+        return volatility
+
+    p, s, k, t, r, q, c = (value[valid] for value in (price, spot, strike, years, rate, dividend_yield, is_call))
+
+    def value(rows, sigma):
+        diff = black_scholes(s[rows], k[rows], t[rows], r[rows], sigma, c[rows], q[rows]) - p[rows]
+        d1, _ = _d1_d2(s[rows], k[rows], t[rows], r[rows], q[rows], sigma)
+        return diff, s[rows] * np.exp(-q[rows] * t[rows]) * norm_pdf(d1) * np.sqrt(t[rows])
+
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2 * math.pi / t) * p / s, low * 10, high / 2)
+    sigma = safeguarded_newton(value, sigma, low, high, tol=tol, max_iter=max_iter)
+
+    volatility[valid] = sigma
+    return volatility
+
+def years_to_expiration(expiration, now=None, expiry_hour=17):
+    """Year fractions (365 days) until expiry_hour of every expiration date."""
+
+    now = pd.Timestamp(now if now is not None else datetime.datetime.now())
+    expiration = pd.to_datetime(pd.Series(expiration)).dt.normalize() + pd.Timedelta(hours=expiry_hour)
+    return ((expiration - now).dt.total_seconds() / (365 * 86400)).to_numpy(dtype=np.float64)
+
+def underlying_prices(frames, price='last'):
+    """Symbol -> price Series from get_bluechips/get_galpones frames, first frame wins."""
+
+    series = [frame.drop_duplicates('symbol').set_index('symbol')[price] for frame in frames if frame is not None and not frame.empty]
+    if not series:
+        return pd.Series(dtype=np.float64)
+    prices = pd.concat(series)
+    return prices[~prices.index.duplicated(keep='first')].astype(np.float64)
+
+def option_chain(options, underlying, rate, now=None, price='mid', dividend_yield=0.0, expiry_hour=17):
+    """
+    Implied volatility and greeks for a whole get_options() chain.
+
+    underlying maps underlying_asset to its price: a dict, a Series, or the
+    frames of get_bluechips/get_galpones (their last price is used). rate
+    is the continuously compounded annual rate, scalar or per row. Returns
+    a copy of options with spot, years, price, iv, delta, gamma, vega and
+    theta columns; rows without a usable price get NaN.
+    """
+
+    if isinstance(underlying, (list, tuple)):
+        underlying = underlying_prices(underlying)
+    underlying = pd.Series(underlying, dtype=np.float64)
+
+    df = options.copy()
+    df['spot'] = df.underlying_asset.map(underlying).astype(np.float64)
+    df['years'] = years_to_expiration(df.expiration, now, expiry_hour) if len(df) else np.empty(0)
+    df['price'] = quote_prices(df, price)
+
+    is_call = (df.kind == 'CALL').to_numpy()
+    spot, strike, years = df.spot.to_numpy(), df.strike.to_numpy(dtype=np.float64), df.years.to_numpy()
+    iv = implied_volatility(df.price.to_numpy(), spot, strike, years, rate, is_call, dividend_yield)
+    df['iv'] = iv
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, values in greeks(spot, strike, years, rate, iv, is_call, dividend_yield).items():
+            df[name] = values
+    return df
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from ..common.lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+
+def repo_currency(symbol):
+    """Currency of a caución board symbol: USD for the dollar ones, ARS otherwise."""
+
+    symbol = str(symbol).upper()
+    return 'USD' if any(tag in symbol for tag in ('USD', 'DOL', 'U$S')) else 'ARS'
+
+
+class RepoCurve:
+    """
+    ARS and USD caución curves built from get_repos() polls.
+
+    The quoted rates are simple annual rates in percent (TNA, 365 days)
+    for the term of every node. Between nodes the log discount factor is
+    interpolated linearly in days, i.e. the implied daily rate is constant,
+    and past the last node the last daily rate is kept. update() only
+    rebuilds the currencies whose nodes changed. A tenor without a quote
+    in a poll keeps its previous rate until it is max_age seconds old (None
+    keeps it forever), so a tenor that stopped trading does not bend the
+    curve of later sessions. Lookups work on the prebuilt per-day arrays
+    and take scalars or arrays of days.
+    """
+
+    def __init__(self, rate='mid', currency=repo_currency, max_age=900):
+        self.__rate = rate
+        self.__currency = currency
+        self.max_age = max_age
+        self.__nodes = {}
+        self.__quoted_at = {}
+        self.__curves = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def currencies(self):
+        return sorted(self.__curves)
+
+    def update(self, repos):
+        """Merges a get_repos() frame into the curves and returns the currencies rebuilt."""
+
+        df = repos.reset_index() if 'symbol' not in repos.columns else repos
+        days = pd.to_numeric(df['days'], errors='coerce').to_numpy(dtype=np.float64)
+        rates = self.__quoted_rates(df)
+        currencies = df.symbol.map(self.__currency).to_numpy()
+
+        valid = (days > 0) & np.isfinite(rates)
+        quotes = pd.DataFrame({'currency': currencies[valid], 'days': days[valid].astype(np.int64), 'rate': rates[valid]})
+        quotes = quotes.groupby(['currency', 'days']).rate.mean()
+
+        now = time.monotonic()
+        quoted = {currency: dict(zip(group.index.get_level_values('days').tolist(), group.tolist())) for currency, group in quotes.groupby(level='currency')}
+
+        rebuilt = []
+        with self.__lock:
+            for currency in sorted(set(self.__nodes) | set(quoted)):
+                nodes = dict(self.__nodes.get(currency, {}))
+                quoted_at = self.__quoted_at.setdefault(currency, {})
+                nodes.update(quoted.get(currency, {}))
+                quoted_at.update(dict.fromkeys(quoted.get(currency, {}), now))
+                if self.max_age is not None:
+                    for day in [day for day, at in quoted_at.items() if now - at > self.max_age]:
+                        del nodes[day], quoted_at[day]
+                if nodes == self.__nodes.get(currency):
+                    continue
+                if nodes:
+                    self.__nodes[currency] = nodes
+                    self.__curves[currency] = self.__build(nodes)
+                else:
+                    # Every tenor went stale: the currency has no curve until it is quoted again
+                    self.__nodes.pop(currency, None)
+                    self.__curves.pop(currency, None)
+                rebuilt.append(currency)
+        return rebuilt
+
+    def discount(self, days, currency='ARS'):
+        """Discount factor for a tenor in days."""
+
+        return np.exp(self.__log_discount(days, currency))
+
+    def rate(self, days, currency='ARS'):
+        """Simple annual rate (TNA, 365 days, in percent like the board) for a tenor in days."""
+
+        days = np.asarray(days, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.exp(-self.__log_discount(days, currency)) - 1) * 36500 / days
+
+    def daily_rates(self, currency='ARS'):
+        """Implied TNA (percent) of every single day from day 0 to the last node."""
+
+        _, log_discount, _ = self.__curve(currency)
+        return (np.exp(-np.diff(log_discount)) - 1) * 36500
+
+    def nodes(self, currency='ARS'):
+        """Quoted nodes of a curve as a DataFrame with days, rate and discount."""
+
+        with self.__lock:
+            nodes = dict(self.__nodes.get(currency, {}))
+        days = np.array(sorted(nodes), dtype=np.int64)
+        rates = np.array([nodes[day] for day in days.tolist()], dtype=np.float64)
+        return pd.DataFrame({'days': days, 'rate': rates, 'discount': 1 / (1 + rates * days / 36500)})
+
+    def __quoted_rates(self, df):
+
+        if self.__rate != 'mid':
+            return pd.to_numeric(df[self.__rate], errors='coerce').to_numpy(dtype=np.float64)
+
+        bid = df.bid_rate.to_numpy(dtype=np.float64)
+        ask = df.ask_rate.to_numpy(dtype=np.float64)
+        mid = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), np.nan)
+        return np.where(np.isnan(mid), df['last'].to_numpy(dtype=np.float64), mid)
+
+    def __build(self, nodes):
+        # Rates come in percent, as shown by the board
+        days = np.array(sorted(nodes), dtype=np.float64)
+        rates = np.array([nodes[day] for day in sorted(nodes)], dtype=np.float64) / 100
+        node_log_discount = np.concatenate([[0.0], -np.log1p(rates * days / 365)])
+        node_days = np.concatenate([[0.0], days])
+
+        grid = np.arange(int(days[-1]) + 1, dtype=np.float64)
+        log_discount = np.interp(grid, node_days, node_log_discount)
+        slope = (node_log_discount[-1] - node_log_discount[-2]) / (node_days[-1] - node_days[-2])
+        return grid, log_discount, slope
+
+    def __curve(self, currency):
+
+        curve = self.__curves.get(currency)
+        if curve is None:
+            raise KeyError('No repo curve for {}. Curves available: {}.'.format(currency, ', '.join(self.currencies) or 'none'))
+        return curve
+
+    def __log_discount(self, days, currency):
+
+        grid, log_discount, slope = self.__curve(currency)
+        days = np.asarray(days, dtype=np.float64)
+        last = grid[-1]
+        return np.where(days > last, log_discount[-1] + (days - last) * slope, np.interp(days, grid, log_discount))
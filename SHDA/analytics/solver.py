@@ -0,0 +1,53 @@
+from ..common.lazy import LazyModule
+
+np = LazyModule('numpy')
+
+
+def safeguarded_newton(func, x, low, high, increasing=True, tol=1e-8, max_iter=100):
+    """
+    Solves func(rows, x) == 0 for many independent monotonic problems at
+    once. func returns the value and derivative of the problems in rows
+    (an index array) at x. Every problem keeps a bracket [low, high] holding
+    its root and falls back to bisection when the Newton step leaves it or
+    the derivative vanishes. Iterates until x moves less than tol.
+    """
+
+    x = np.array(x, dtype=np.float64)
+    lo = np.broadcast_to(np.asarray(low, dtype=np.float64), x.shape).copy()
+    hi = np.broadcast_to(np.asarray(high, dtype=np.float64), x.shape).copy()
+
+    active = np.ones(x.shape, dtype=bool)
+    for _ in range(max_iter):
+        rows = np.flatnonzero(active)
+        if not rows.size:
+            break
+        current = x[rows]
+        value, derivative = func(rows, current)
+
+        above = value > 0 if increasing else value < 0
+        hi[rows] = np.where(above, current, hi[rows])
+        lo[rows] = np.where(above, lo[rows], current)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = current - value / derivative
+        done = (np.abs(step - current) <= tol) | (value == 0) | (hi[rows] - lo[rows] <= tol)
+        bisect = ~np.isfinite(step) | (step <= lo[rows]) | (step >= hi[rows])
+        x[rows] = np.where(done, np.where(value == 0, current, step), np.where(bisect, 0.5 * (lo[rows] + hi[rows]), step))
+        active[rows] = ~done
+
+    return x
+
+def quote_prices(df, price='mid'):
+    """
+    Price column used by the analytics: a column name, or 'mid' for the
+    mid of bid and ask, falling back to the last trade when there is no
+    two sided market.
+    """
+
+    if price != 'mid':
+        return df[price].to_numpy(dtype=np.float64)
+
+    bid = df.bid.to_numpy(dtype=np.float64)
+    ask = df.ask.to_numpy(dtype=np.float64)
+    mid = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), np.nan)
+    return np.where(np.isnan(mid), df['last'].to_numpy(dtype=np.float64), mid)
@@ -0,0 +1,2 @@
+from .collector import Collector, BarCollector
+from .sinks import SQLiteSink, ParquetSink, RestSink
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..common import maps, payloads, changed_rows
+from ..common.instrumentation import bind
+from ..common.lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+logger = logging.getLogger(__name__)
+
+
+class Collector:
+    """
+    Polls the quotes of a ticker universe and stores the rows that changed.
+
+    Every poll downloads, concurrently, only the boards holding the tickers
+    (SHDA.get_quotes), converts the trade times from the broker timezone to
+    UTC in one vectorized pass and drops the rows equal to the last row
+    stored for the same (symbol, settlement). New rows are buffered and
+    written to the sink with upsert semantics when batch_size rows are
+    waiting or flush_interval seconds have passed, so a failed write is
+    retried with the next flush instead of leaving a gap, and a row written
+    twice is never duplicated. Rows without a trade time are skipped.
+    """
+
+    key = ['symbol', 'settlement', 'datetime']
+    instrument = ['symbol', 'settlement']
+    numeric_columns = [name for name in maps.securities_columns if name in maps.numeric_columns]
+
+    def __init__(self, hb, symbols, sink, settlement='48hs', interval=30, batch_size=500, flush_interval=60, max_workers=None, timezone='America/Argentina/Buenos_Aires'):
+        self.hb = hb
+        self.symbols = list(dict.fromkeys(symbols))
+        self.sink = sink
+        self.settlement = settlement
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_workers = max_workers
+        self.timezone = timezone
+        self.stats = {'polls': 0, 'rows': 0, 'new_rows': 0, 'written': 0, 'errors': 0}
+        self.__columns = self.key + self.numeric_columns
+        self.__previous = None
+        self.__seeded = False
+        self.__buffer = []
+        self.__buffered = 0
+        self.__buffered_at = None
+
+    def fetch(self):
+        """Current rows of the universe, as returned by the broker."""
+
+        return self.hb.get_quotes(self.symbols, self.settlement, max_age=0, max_workers=self.max_workers)
+
+    def poll(self):
+        """Fetches the universe once, buffers the changed rows and returns them."""
+
+        if not self.__seeded:
+            self.seed()
+
+        df = self.normalize(self.fetch())
+        new, self.__previous = changed_rows(df, self.__previous, self.instrument, self.__columns)
+        new = new.assign(updated_at=pd.Timestamp.now(tz='UTC'))
+
+        self.stats['polls'] += 1
+        self.stats['rows'] += len(df)
+        self.stats['new_rows'] += len(new)
+        if not new.empty:
+            self.__buffer.append(new)
+            self.__buffered += len(new)
+            if self.__buffered_at is None:
+                self.__buffered_at = time.monotonic()
+        if self.__buffered >= self.batch_size or (self.__buffered_at is not None and time.monotonic() - self.__buffered_at >= self.flush_interval):
+            self.flush()
+        return new
+
+    def flush(self):
+        """Writes the buffered rows to the sink. On failure they stay buffered."""
+
+        if not self.__buffer:
+            return 0
+
+        batch = pd.concat(self.__buffer, ignore_index=True).drop_duplicates(subset=self.key, keep='last')
+        written = self.sink.upsert(batch, self.key)
+        self.__buffer, self.__buffered, self.__buffered_at = [], 0, None
+        self.stats['written'] += written
+        return written
+
+    def normalize(self, df):
+        """Rows to store: key and price columns, numeric as float64 and times in UTC."""
+
+        df = df.reindex(columns=self.__columns)
+        df[self.numeric_columns] = df[self.numeric_columns].astype('float64')
+        times = pd.to_datetime(df['datetime'])
+        if times.dt.tz is None:
+            times = times.dt.tz_localize(self.timezone, ambiguous='NaT', nonexistent='NaT')
+        df['datetime'] = times.dt.tz_convert('UTC').astype('datetime64[ns, UTC]')
+        return df[df['datetime'].notna()].reset_index(drop=True)
+
+    def run(self, max_polls=None):
+        """
+        Polls every interval seconds until max_polls (forever by default).
+        Any error of a poll (broker, network, decoding or sink) is counted
+        and logged and the loop goes on; the buffer is flushed on exit.
+        Every poll logs its row counts at INFO level.
+        """
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                started = time.monotonic()
+                try:
+                    new = self.poll()
+                    logger.info('%d new rows, %d written', len(new), self.stats['written'])
+                except Exception as ex:
+                    self.stats['errors'] += 1
+                    logger.warning('Collector error: %s', ex)
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    time.sleep(max(0, self.interval - (time.monotonic() - started)))
+        finally:
+            self.flush()
+
+    def seed(self):
+        """
+        Loads the last stored rows as the baseline of the dedupe, so a
+        restart does not write the same rows again, and returns them
+        normalized (None when the sink has none). The first poll calls it.
+        """
+
+        self.__seeded = True
+        stored = self.sink.last_rows(self.key)
+        if stored is None or stored.empty:
+            return None
+        stored = self.normalize(stored.assign(datetime=pd.to_datetime(stored['datetime'], utc=True)))
+        _, self.__previous = changed_rows(stored, None, self.instrument, self.__columns)
+        return stored
+
+class BarCollector(Collector):
+    """
+    Polls the minute bars of a ticker universe and stores the new ones.
+
+    Every poll calls SHDA.get_intraday_history for each ticker concurrently,
+    which only requests the bars from the last one already returned (it is
+    refreshed while it may still be forming). After a restart the first
+    request of a ticker starts at its last stored bar. Bars equal to the
+    ones stored before are dropped; buffering and writes work as in
+    Collector, keyed by (symbol, resolution, datetime).
+    """
+
+    key = ['symbol', 'resolution', 'datetime']
+    instrument = key
+    numeric_columns = ['open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, hb, symbols, sink, resolution=1, interval=60, batch_size=500, flush_interval=60, max_workers=8):
+        super().__init__(hb, symbols, sink, interval=interval, batch_size=batch_size, flush_interval=flush_interval, max_workers=max_workers)
+        self.resolution = payloads.intraday_resolution(resolution)
+        self.__since = {}
+        self.__lock = threading.Lock()
+
+    def fetch(self):
+
+        # A ticker that fails is counted and skipped, the others are stored
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers or 8, len(self.symbols)))) as executor:
+            frames = [frame for frame in executor.map(bind(self.__fetch), self.symbols) if frame is not None]
+        if not frames:
+            return pd.DataFrame(columns=self.key + self.numeric_columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def seed(self):
+
+        stored = super().seed()
+        if stored is not None:
+            last = stored[stored['resolution'] == self.resolution].groupby('symbol')['datetime'].max()
+            self.__since = {symbol: value.to_pydatetime() for symbol, value in last.items()}
+        return stored
+
+    def __fetch(self, symbol):
+
+        try:
+            df = self.hb.get_intraday_history(symbol, self.resolution, since=self.__since.get(symbol), max_age=0)
+        except Exception as ex:
+            with self.__lock:
+                self.stats['errors'] += 1
+            logger.warning('Collector error in %s: %s', symbol, ex)
+            return None
+        # The stored resume point is only needed until the first fetch that works
+        self.__since.pop(symbol, None)
+        return df.assign(symbol=symbol, resolution=self.resolution)
@@ -0,0 +1,78 @@
+"""
+Collector entry point.
+
+Logs in with the BROKER_ID, DNI, USER and PASSWORD environment variables
+and stores the quotes of the tickers every --interval seconds:
+
+    python -m SHDA.collector --tickers AL30 GD30 TX26 --sqlite quotes.db
+    python -m SHDA.collector --tickers-file tickers.txt --parquet ./quotes
+
+With --resolution the new minute bars of that many minutes are stored
+instead of the quotes:
+
+    python -m SHDA.collector --tickers AL30 GD30 --resolution 1 --sqlite bars.db
+
+With SUPABASE_URL and SUPABASE_API_KEY set (and no local sink given) the
+rows are upserted into the --table of that Supabase project.
+"""
+import argparse
+import logging
+import os
+
+from ..SHDA import SHDA
+from ..common import payloads
+from .collector import Collector, BarCollector
+from .sinks import SQLiteSink, ParquetSink, RestSink
+
+
+def make_sink(args):
+
+    if args.sqlite:
+        return SQLiteSink(args.sqlite, args.table)
+    if args.parquet:
+        return ParquetSink(args.parquet)
+    if os.getenv('SUPABASE_URL') and os.getenv('SUPABASE_API_KEY'):
+        return RestSink.supabase(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_API_KEY'), args.table)
+    return SQLiteSink('collector.db', args.table)
+
+def main(argv=None, tickers=()):
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', nargs='+', default=list(tickers), help='symbols to collect')
+    parser.add_argument('--tickers-file', help='file with one symbol per line')
+    parser.add_argument('--settlement', default='48hs')
+    parser.add_argument('--resolution', type=payloads.intraday_resolution, help='minutes per bar, to store intraday bars instead of quotes')
+    parser.add_argument('--interval', type=float, default=30, help='seconds between polls')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows that trigger a write')
+    parser.add_argument('--flush-interval', type=float, default=60, help='seconds after which buffered rows are written')
+    parser.add_argument('--sqlite', help='SQLite database file')
+    parser.add_argument('--parquet', help='Parquet dataset directory')
+    parser.add_argument('--table', default='shda_quotes', help='SQLite or REST table')
+    parser.add_argument('--log-level', default='WARNING', help='INFO also logs the rows of every poll')
+    parser.add_argument('--session-store', default=os.getenv('SHDA_SESSION_STORE'), help='file to reuse the broker session between runs')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    symbols = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not symbols:
+        parser.error('no tickers given')
+
+    credentials = [os.getenv(name) for name in ('BROKER_ID', 'DNI', 'USER', 'PASSWORD')]
+    if not all(credentials):
+        parser.error('BROKER_ID, DNI, USER and PASSWORD must be set')
+
+    hb = SHDA(int(credentials[0]), *credentials[1:], session_store=args.session_store)
+    sink = make_sink(args)
+    if args.resolution:
+        collector = BarCollector(hb, symbols, sink, resolution=args.resolution, interval=args.interval, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    else:
+        collector = Collector(hb, symbols, sink, settlement=args.settlement, interval=args.interval, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    try:
+        collector.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
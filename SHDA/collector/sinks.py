@@ -0,0 +1,173 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+from ..common import Transport
+from ..common.lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+
+def to_text_times(df):
+    """Copy of df with its datetime columns as UTC ISO 8601 strings."""
+
+    df = df.copy()
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            values = pd.to_datetime(df[name], utc=True)
+            df[name] = values.dt.strftime('%Y-%m-%dT%H:%M:%SZ').where(values.notna(), None)
+    return df
+
+def to_rows(df):
+    """Rows of df as tuples, with None for missing values."""
+
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+class SQLiteSink:
+    """
+    Local SQLite table keyed by the collector key columns. Batches are
+    written with INSERT ... ON CONFLICT DO UPDATE in one transaction, so
+    sending a batch again never duplicates rows.
+    """
+
+    def __init__(self, path, table='quotes'):
+        self.path = os.path.expanduser(path)
+        self.table = table
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__columns = None
+
+    def upsert(self, df, key):
+
+        if df.empty:
+            return 0
+
+        columns = list(df.columns)
+        names = ', '.join('"{}"'.format(name) for name in columns)
+        updates = ', '.join('"{0}"=excluded."{0}"'.format(name) for name in columns if name not in key)
+        sql = 'INSERT INTO "{}" ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}'.format(
+            self.table, names, ', '.join('?' * len(columns)), ', '.join('"{}"'.format(name) for name in key), updates)
+
+        rows = to_rows(to_text_times(df))
+        with self.__lock, self.__connection:
+            self.__create(df, key)
+            self.__connection.executemany(sql, rows)
+        return len(df)
+
+    def last_rows(self, key):
+        """
+        Last stored row of every instrument (every key but the last
+        column), or None when the table does not exist yet.
+        """
+
+        group = ', '.join('"{}"'.format(name) for name in key[:-1])
+        with self.__lock:
+            exists = self.__connection.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (self.table,)).fetchone()
+            if not exists:
+                return None
+            return pd.read_sql_query('SELECT * FROM "{0}" WHERE ({1}, "{2}") IN (SELECT {1}, MAX("{2}") FROM "{0}" GROUP BY {1})'.format(self.table, group, key[-1]), self.__connection)
+
+    def close(self):
+        self.__connection.close()
+
+    def __create(self, df, key):
+
+        if self.__columns is not None:
+            return
+
+        types = ['"{}" {}'.format(name, 'REAL' if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) else 'TEXT') for name, dtype in df.dtypes.items()]
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS "{}" ({}, PRIMARY KEY ({}))'.format(self.table, ', '.join(types), ', '.join('"{}"'.format(name) for name in key)))
+        self.__columns = list(df.columns)
+
+class ParquetSink:
+    """
+    Local Parquet dataset with one file per day of the last key column.
+    A batch rewrites only the days it touches, replacing the stored rows
+    with the same key, and every file is swapped in atomically.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.__lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def upsert(self, df, key):
+
+        if df.empty:
+            return 0
+
+        days = pd.to_datetime(df[key[-1]], utc=True).dt.strftime('%Y-%m-%d')
+        with self.__lock:
+            for day, batch in df.groupby(days.to_numpy()):
+                file = self.__file(day)
+                if os.path.exists(file):
+                    batch = pd.concat([pd.read_parquet(file), batch], ignore_index=True)
+                batch = batch.drop_duplicates(subset=key, keep='last').sort_values(key[::-1], kind='stable')
+                tmp = '{}.{}.tmp'.format(file, os.getpid())
+                batch.to_parquet(tmp, index=False)
+                os.replace(tmp, file)
+        return len(df)
+
+    def last_rows(self, key):
+        """Last stored row of every instrument, read from the latest day file."""
+
+        files = sorted(name for name in os.listdir(self.path) if name.endswith('.parquet'))
+        if not files:
+            return None
+        df = pd.read_parquet(os.path.join(self.path, files[-1]))
+        return df.sort_values(key[-1], kind='stable').drop_duplicates(subset=key[:-1], keep='last')
+
+    def close(self):
+        pass
+
+    def __file(self, day):
+        return os.path.join(self.path, '{}.parquet'.format(day))
+
+class RestSink:
+    """
+    PostgREST style HTTP sink (Supabase and compatible services): every
+    batch is one POST of a JSON array with on_conflict and
+    Prefer: resolution=merge-duplicates, so the server upserts it. The
+    request is idempotent, so the Transport retries it on failures.
+    """
+
+    def __init__(self, url, table, headers=None, transport=None):
+        self.url = url.rstrip('/')
+        self.table = table
+        self.headers = dict(headers or {})
+        self.__t = transport if transport is not None else Transport()
+
+    @classmethod
+    def supabase(cls, url, api_key, table, transport=None):
+        headers = {'apikey': api_key, 'Authorization': 'Bearer {}'.format(api_key)}
+        return cls('{}/rest/v1'.format(url.rstrip('/')), table, headers, transport)
+
+    def upsert(self, df, key):
+
+        if df.empty:
+            return 0
+
+        headers = dict(self.headers, **{'Content-Type': 'application/json', 'Prefer': 'resolution=merge-duplicates,return=minimal'})
+        df = to_text_times(df)
+        body = json.dumps([dict(zip(df.columns, row)) for row in to_rows(df)], default=_json_default)
+        self.__t.post('{}/{}'.format(self.url, self.table), params={'on_conflict': ','.join(key)}, data=body, headers=headers, idempotent=True)
+        return len(df)
+
+    def last_rows(self, key):
+        # Rows already stored are merged by the server, no need to seed the dedupe
+        return None
+
+    def close(self):
+        pass
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError('{} is not JSON serializable'.format(type(value).__name__))
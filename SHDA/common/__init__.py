@@ -21,5 +21,15 @@
 #
 
 from .brokers import brokers
-from .helpers import convert_to_numeric_columns
+from .helpers import convert_to_numeric_columns, changed_rows
 from .exceptions import SessionException, BrokerNotSupportedException, ServerException, DataException
+from .cache import ResponseCache
+from .transport import Transport, CircuitBreaker
+from .history_store import HistoryStore
+from .holdings_store import HoldingsStore
+from .instrumentation import Instrumentation, CallEvent
+from .session_store import SessionStore, KeyringSessionStore
+from .records import Quote
+from .quote_book import QuoteBook
+from .mark_to_market import MarkToMarket
+from . import maps, parsers, payloads, instrumentation, records, columnar
@@ -0,0 +1,87 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    """
+    In-process LRU cache for decoded broker responses.
+
+    Entries are keyed by (endpoint, payload) and live for the TTL configured
+    for their endpoint, unless the caller passes a max_age. Responses fetched
+    with a TTL of 0 are not stored, since they could never be served. Identical
+    requests issued while one is already in flight wait for it instead of
+    hitting the broker again, and get their own copy of its exception if it
+    fails.
+    """
+
+    default_ttls = {
+        'GetByPanel': 0,
+        'GetFavoritos': 0,
+        'history': 0}
+
+    def __init__(self, ttls=None, maxsize=256):
+        self.__ttls = dict(self.default_ttls, **(ttls or {}))
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__in_flight = {}
+        self.__lock = threading.Lock()
+
+    def get(self, endpoint, payload, fetch, max_age=None):
+
+        key = (endpoint, payload)
+        ttl = self.__ttls.get(endpoint, 0) if max_age is None else max_age
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= ttl:
+                self.__entries.move_to_end(key)
+                return entry[1]
+
+            call = self.__in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.__in_flight[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                # Every waiter raises its own copy, so the tracebacks of the
+                # threads are not appended to the same exception object
+                raise _copy_error(call.error) from call.error
+            return call.value
+
+        try:
+            call.value = fetch()
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+                if call.error is None and ttl > 0:
+                    self.__entries[key] = (time.monotonic(), call.value)
+                    self.__entries.move_to_end(key)
+                    while len(self.__entries) > self.__maxsize:
+                        self.__entries.popitem(last=False)
+            call.event.set()
+
+        return call.value
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+def _copy_error(error):
+    try:
+        return copy.copy(error)
+    except Exception:
+        # Exceptions that cannot be rebuilt from their args
+        return RuntimeError('{}: {}'.format(type(error).__name__, error))
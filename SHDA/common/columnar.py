@@ -0,0 +1,49 @@
+from .records import column_types
+
+
+backends = ('arrow', 'polars')
+
+def _arrow_type(pa, name):
+    kind = column_types.get(name, 'float')
+    if kind == 'string':
+        return pa.string()
+    if kind == 'int':
+        return pa.int64()
+    if kind == 'timestamp':
+        return pa.timestamp('us')
+    if kind == 'date':
+        return pa.date32()
+    return pa.float64()
+
+def to_arrow(columns):
+    """
+    Builds a pyarrow Table straight from a dict column -> list of values,
+    with a fixed type per column so empty or all-null boards keep their
+    schema. None values become nulls.
+    """
+
+    import pyarrow as pa
+
+    return pa.table({name: pa.array(values, type=_arrow_type(pa, name)) for name, values in columns.items()})
+
+def to_polars(columns):
+    # Polars adopts the Arrow buffers without copying them
+    import polars as pl
+
+    return pl.from_arrow(to_arrow(columns))
+
+def build(columns, backend):
+
+    if backend == 'arrow':
+        return to_arrow(columns)
+    if backend == 'polars':
+        return to_polars(columns)
+    if backend == 'columns':
+        return columns
+    raise ValueError('Backend not supported: {}. Backends supported: pandas, {}.'.format(backend, ', '.join(backends)))
+
+def from_pandas(df, backend):
+    """Column dict or table for a frame that was already built with pandas (e.g. read from a HistoryStore)."""
+
+    columns = {name: df[name].tolist() for name in df.columns}
+    return build(columns, backend)
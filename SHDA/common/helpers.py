@@ -20,13 +20,78 @@
 # limitations under the License.
 #
 
-import pandas as pd
-import numpy as np
+from .instrumentation import timed
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+_numeric_inferred_types = ('empty', 'integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean')
 
 def convert_to_numeric_columns(df, columns):
 
-    for col in columns:
-        df[col] = df[col].apply(lambda x: x.replace('.', '').replace(',','.') if isinstance(x, str) else x)
-        df[col] = pd.to_numeric(df[col].apply(lambda x: np.nan if x == '-' else x))
+    with timed('convert'):
+        for col in columns:
+            df[col] = _convert_to_numeric(df[col])
 
     return df
+
+def _convert_to_numeric(series):
+
+    # Typed fast path: the JSON already holds numbers, nothing to parse.
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred in _numeric_inferred_types:
+        return pd.to_numeric(series)
+    if inferred != 'string':
+        return _convert_to_numeric_elementwise(series)
+
+    values = series.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    if missing.any():
+        values = values.copy()
+        values[missing] = '-'
+
+    # Argentine format ('.' thousands, ',' decimals, '-' missing) is rewritten
+    # for the whole column in a single string and parsed by numpy in C.
+    text = '\n' + '\n'.join(values).replace('.', '').replace(',', '.') + '\n'
+    for token in ('\n-\n', '\n\n'):
+        # Twice, so consecutive missing cells are replaced as well
+        text = text.replace(token, '\nnan\n').replace(token, '\nnan\n')
+    tokens = text[1:-1].split('\n')
+
+    try:
+        if 'nan' in text or '.' in text:
+            raise ValueError
+        parsed = np.array(tokens, dtype=np.int64)
+    except (ValueError, OverflowError):
+        try:
+            parsed = np.array(tokens, dtype=np.float64)
+        except ValueError:
+            return _convert_to_numeric_elementwise(series)
+
+    return pd.Series(parsed, index=series.index, name=series.name)
+
+def _convert_to_numeric_elementwise(series):
+
+    series = series.apply(lambda x: x.replace('.', '').replace(',','.') if isinstance(x, str) else x)
+    return pd.to_numeric(series.apply(lambda x: np.nan if x == '-' else x))
+
+def changed_rows(df, previous, index, columns):
+    """
+    Returns the rows of df whose columns changed against the previous poll,
+    plus the per row hashes to pass as previous on the next call.
+    """
+
+    df = df.drop_duplicates(subset=index, keep='last')
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    hashes.index = pd.MultiIndex.from_frame(df[index])
+
+    if previous is None:
+        return df, hashes
+
+    before = previous.reindex(hashes.index)
+    changed = before.isna().to_numpy() | (before.to_numpy() != hashes.to_numpy())
+    return df[changed], hashes
@@ -0,0 +1,121 @@
+import datetime
+import importlib.util
+import json
+import os
+import threading
+
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+
+def _parquet_available():
+    # Only looks for pyarrow, pandas imports it when a file is written
+    return importlib.util.find_spec('pyarrow') is not None
+
+def _to_date(dt):
+    if isinstance(dt, str):
+        return datetime.datetime.strptime(dt, '%Y-%m-%d').date()
+    if isinstance(dt, datetime.datetime):
+        return dt.date()
+    return dt
+
+class HistoryStore:
+    """
+    Local per symbol store for daily bars downloaded by get_daily_history.
+
+    Every symbol keeps its bars in one Parquet file (pickle when pyarrow is
+    not installed) plus a small JSON file with the date range already
+    downloaded, so weekends and holidays inside that range are not asked
+    again. Only closed days are persisted, today's bar is always refreshed.
+    """
+
+    def __init__(self, path, file_format=None):
+        self.path = path
+        self.file_format = file_format or ('parquet' if _parquet_available() else 'pickle')
+        self.__lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def load(self, symbol):
+
+        covered = self.covered(symbol)
+        if covered is None:
+            return None, None
+
+        file = self.__file(symbol)
+        df = pd.read_parquet(file) if self.file_format == 'parquet' else pd.read_pickle(file)
+        return df, covered
+
+    def covered(self, symbol):
+
+        meta = self.__meta_file(symbol)
+        if not os.path.exists(meta) or not os.path.exists(self.__file(symbol)):
+            return None
+
+        with open(meta) as f:
+            covered = json.load(f)
+        return _to_date(covered['from']), _to_date(covered['to'])
+
+    def missing_spans(self, symbol, from_date, to_date):
+
+        from_date, to_date = _to_date(from_date), _to_date(to_date)
+        covered = self.covered(symbol)
+        if covered is None:
+            return [(from_date, to_date)]
+
+        # Spans always touch the covered range so it stays contiguous
+        one_day = datetime.timedelta(days=1)
+        spans = []
+        if from_date < covered[0]:
+            spans.append((from_date, covered[0] - one_day))
+        if to_date > covered[1]:
+            spans.append((covered[1] + one_day, to_date))
+        return spans
+
+    def update(self, symbol, frames, from_date, to_date):
+        """
+        Appends the downloaded frames to the stored bars and returns every
+        bar, stored or new, between from_date and to_date.
+        """
+
+        from_date, to_date = _to_date(from_date), _to_date(to_date)
+        today = datetime.date.today()
+
+        with self.__lock:
+            cached, covered = self.load(symbol)
+            frames = [frame for frame in [cached] + list(frames) if frame is not None and not frame.empty]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume'])
+            df = df.drop_duplicates(subset='date', keep='last').sort_values('date').reset_index(drop=True)
+
+            closed = df[df.date < today]
+            closed_to = min(to_date, today - datetime.timedelta(days=1))
+            if closed_to >= from_date:
+                new_from = from_date if covered is None else min(from_date, covered[0])
+                new_to = closed_to if covered is None else max(closed_to, covered[1])
+                self.__save(symbol, closed, new_from, new_to)
+
+        return df[(df.date >= from_date) & (df.date <= to_date)].reset_index(drop=True)
+
+    def clear(self, symbol):
+        for file in (self.__file(symbol), self.__meta_file(symbol)):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def __save(self, symbol, df, from_date, to_date):
+
+        file = self.__file(symbol)
+        tmp = file + '.tmp'
+        if self.file_format == 'parquet':
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, file)
+
+        with open(self.__meta_file(symbol), 'w') as f:
+            json.dump({'from': from_date.isoformat(), 'to': to_date.isoformat()}, f)
+
+    def __file(self, symbol):
+        return os.path.join(self.path, '{}.{}'.format(symbol.upper(), 'parquet' if self.file_format == 'parquet' else 'pkl'))
+
+    def __meta_file(self, symbol):
+        return os.path.join(self.path, '{}.json'.format(symbol.upper()))
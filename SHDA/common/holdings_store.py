@@ -0,0 +1,59 @@
+import datetime
+import json
+import os
+import threading
+
+
+class HoldingsStore:
+    """
+    Local store for the GetConsulta responses of closed days used by
+    Portfolio.by_range.
+
+    The holdings of a past date never change, so the decoded response of
+    every (comitente, moneda, date) is kept in one JSON file per comitente
+    and moneda and the date is never asked again. Today and future dates
+    are never stored.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.__lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def load(self, comitente, moneda, dates):
+        """Stored responses of the given dates, as a dict date -> response."""
+
+        entries = self.__read(comitente, moneda)
+        return {date: entries[date.isoformat()] for date in dates if date.isoformat() in entries}
+
+    def save(self, comitente, moneda, responses):
+        """Stores the responses (dict date -> response) of the closed dates."""
+
+        today = datetime.date.today()
+        closed = {date.isoformat(): data for date, data in responses.items() if date < today}
+        if not closed:
+            return
+
+        with self.__lock:
+            entries = self.__read(comitente, moneda)
+            entries.update(closed)
+            file = self.__file(comitente, moneda)
+            tmp = '{}.{}.tmp'.format(file, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp, file)
+
+    def clear(self, comitente, moneda):
+        file = self.__file(comitente, moneda)
+        if os.path.exists(file):
+            os.remove(file)
+
+    def __read(self, comitente, moneda):
+        try:
+            with open(self.__file(comitente, moneda)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __file(self, comitente, moneda):
+        return os.path.join(self.path, '{}_{}.json'.format(comitente, moneda))
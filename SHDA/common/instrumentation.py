@@ -0,0 +1,272 @@
+import contextvars
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+
+
+_current = contextvars.ContextVar('shda_call', default=None)
+_rollup_lock = threading.Lock()
+
+phases = ('total', 'network', 'decode', 'build', 'convert', 'compute')
+
+class CallEvent:
+    """
+    Timings of one public call (get_options, account, Portfolio.by_date...).
+
+    network_time covers every HTTP attempt, retries included, until the body
+    is read; decode_time the JSON decode; build_time the DataFrame build,
+    which includes convert_time spent in convert_to_numeric_columns;
+    compute_time the analytics run on the parsed frames (implied
+    volatilities, bond yields, repo curves). A call answered from the
+    response cache has requests == 0.
+
+    Calls that fan out (accounts, get_market_snapshot...) get the requests,
+    bytes and status of their nested calls, while their phase times only
+    cover their own work: every nested call also reports its own event.
+    """
+
+    def __init__(self, method, endpoint, panel=None, parent=None):
+        self.parent = parent
+        self.method = method
+        self.endpoint = endpoint
+        self.panel = panel
+        self.status = None
+        self.requests = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.build_time = 0.0
+        self.convert_time = 0.0
+        self.compute_time = 0.0
+        self.error = None
+
+    @property
+    def cached(self):
+        return self.requests == 0 and self.error is None
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in ('method', 'endpoint', 'panel', 'status', 'requests', 'bytes', 'total_time', 'network_time', 'decode_time', 'build_time', 'convert_time', 'compute_time', 'error', 'cached')}
+
+    def __repr__(self):
+        return 'CallEvent({})'.format(', '.join('{}={!r}'.format(k, v) for k, v in self.as_dict().items()))
+
+class _Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+class Instrumentation:
+    """
+    Collects a CallEvent for every public call of SHDA and Portfolio, hands
+    it to the registered hooks and aggregates it into latency histograms
+    and counters exported in the Prometheus text format.
+    """
+
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, buckets=None, prefix='shda'):
+        self.buckets = tuple(sorted(buckets or self.default_buckets))
+        self.prefix = prefix
+        self.__hooks = []
+        self.__histograms = {}
+        self.__calls = {}
+        self.__bytes = {}
+        self.__requests = {}
+        self.__lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Registers hook(event), called with every finished CallEvent. Returns hook so it can be used as a decorator."""
+        with self.__lock:
+            self.__hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        with self.__lock:
+            self.__hooks.remove(hook)
+
+    @contextmanager
+    def call(self, method, endpoint, panel=None):
+
+        event = CallEvent(method, endpoint, panel, _current.get())
+        token = _current.set(event)
+        started = time.perf_counter()
+        try:
+            yield event
+        except BaseException as ex:
+            event.error = type(ex).__name__
+            raise
+        finally:
+            event.total_time = time.perf_counter() - started
+            _current.reset(token)
+            if event.parent is not None:
+                with _rollup_lock:
+                    event.parent.requests += event.requests
+                    event.parent.bytes += event.bytes
+                    event.parent.status = event.status or event.parent.status
+            self.record(event)
+
+    def record(self, event):
+
+        labels = (event.method, event.endpoint, event.panel or '')
+        status = event.error or ('cached' if event.cached else str(event.status))
+        with self.__lock:
+            for phase in phases:
+                key = labels + (phase,)
+                if key not in self.__histograms:
+                    self.__histograms[key] = _Histogram(self.buckets)
+                self.__histograms[key].observe(getattr(event, phase + '_time'))
+            self.__calls[labels + (status,)] = self.__calls.get(labels + (status,), 0) + 1
+            self.__bytes[labels] = self.__bytes.get(labels, 0) + event.bytes
+            self.__requests[labels] = self.__requests.get(labels, 0) + event.requests
+            hooks = list(self.__hooks)
+
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as ex:
+                # A broken hook must not break the data call it observes
+                warnings.warn('Instrumentation hook {!r} failed: {}'.format(hook, ex), RuntimeWarning)
+
+    def export(self):
+        """Returns every metric in the Prometheus text exposition format."""
+
+        prefix = self.prefix
+        label_names = ('method', 'endpoint', 'panel')
+        lines = []
+        with self.__lock:
+            lines.append('# HELP {}_call_duration_seconds Time spent per public call and phase.'.format(prefix))
+            lines.append('# TYPE {}_call_duration_seconds histogram'.format(prefix))
+            for key, histogram in sorted(self.__histograms.items()):
+                labels = _labels(label_names + ('phase',), key)
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append('{}_call_duration_seconds_bucket{{{},le="{}"}} {}'.format(prefix, labels, _number(bound), count))
+                lines.append('{}_call_duration_seconds_bucket{{{},le="+Inf"}} {}'.format(prefix, labels, histogram.count))
+                lines.append('{}_call_duration_seconds_sum{{{}}} {}'.format(prefix, labels, _number(histogram.sum)))
+                lines.append('{}_call_duration_seconds_count{{{}}} {}'.format(prefix, labels, histogram.count))
+
+            lines.append('# HELP {}_calls_total Public calls by result (HTTP status, cached or exception name).'.format(prefix))
+            lines.append('# TYPE {}_calls_total counter'.format(prefix))
+            for key, value in sorted(self.__calls.items()):
+                lines.append('{}_calls_total{{{}}} {}'.format(prefix, _labels(label_names + ('status',), key), value))
+
+            lines.append('# HELP {}_http_requests_total HTTP requests sent, retries included. Fan-out calls include their nested calls.'.format(prefix))
+            lines.append('# TYPE {}_http_requests_total counter'.format(prefix))
+            for key, value in sorted(self.__requests.items()):
+                lines.append('{}_http_requests_total{{{}}} {}'.format(prefix, _labels(label_names, key), value))
+
+            lines.append('# HELP {}_response_bytes_total Response body bytes received. Fan-out calls include their nested calls.'.format(prefix))
+            lines.append('# TYPE {}_response_bytes_total counter'.format(prefix))
+            for key, value in sorted(self.__bytes.items()):
+                lines.append('{}_response_bytes_total{{{}}} {}'.format(prefix, _labels(label_names, key), value))
+
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9464, host='127.0.0.1'):
+        """Serves export() on http://host:port/metrics from a daemon thread and returns the server."""
+
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        instrumentation = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = instrumentation.export().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+            self.__calls.clear()
+            self.__bytes.clear()
+            self.__requests.clear()
+
+def _labels(names, values):
+    return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in zip(names, values))
+
+def _number(value):
+    return repr(float(value))
+
+def current_call():
+    return _current.get()
+
+def bind(function):
+    """
+    Wraps function so that, when run on a worker thread, the calls it makes
+    are nested in the call that was current where bind was called.
+    """
+    event = _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(event)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+# Worker threads started with bind share the event of their parent call,
+# so every update of an event is done under _rollup_lock
+
+def record_response(response, elapsed):
+    """Called by Transport after every HTTP attempt that got a response."""
+    event = _current.get()
+    if event is not None:
+        size = len(response.content)
+        with _rollup_lock:
+            event.requests += 1
+            event.network_time += elapsed
+            event.status = response.status_code
+            event.bytes += size
+
+def record_failure(elapsed):
+    """Called by Transport after every HTTP attempt that failed without a response."""
+    event = _current.get()
+    if event is not None:
+        with _rollup_lock:
+            event.requests += 1
+            event.network_time += elapsed
+
+@contextmanager
+def timed(phase):
+    """Adds the time spent in the block to the phase of the current call, if any."""
+    event = _current.get()
+    if event is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        name = phase + '_time'
+        with _rollup_lock:
+            setattr(event, name, getattr(event, name) + elapsed)
+
+def decode(response):
+    with timed('decode'):
+        return response.json()
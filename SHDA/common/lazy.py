@@ -0,0 +1,24 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported the first time one of its
+    attributes is used, so `import SHDA` does not pay for pandas, numpy or
+    requests until a feature needs them.
+
+        pd = LazyModule('pandas')
+    """
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        module = self.__module
+        if module is None:
+            module = self.__module = importlib.import_module(self.__name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module {!r}{}>'.format(self.__name, '' if self.__module is None else ' (loaded)')
@@ -0,0 +1,68 @@
+user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0"
+
+settlements_int_map = {
+    '1': 'spot',
+    '2': '24hs',
+    '3': '48hs'}
+
+settlements_map = {'':0,'spot': 1,'24hs': 2,'48hs': 3}
+
+call_put_map = {
+    0: '',
+    1: 'CALL',
+    2: 'PUT'}
+
+boards = {
+    0:"",
+    'accionesLideres':'bluechips',
+    'panelGeneral':'general_board',
+    'cedears': 'cedears',
+    'rentaFija':'government_bonds',
+    'letes':'short_term_government_bonds',
+    'obligaciones':'corporate_bonds'}
+
+securities_columns = ['symbol', 'settlement', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'group']
+filter_columns = ['Symbol', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'Panel']
+numeric_columns = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close']
+
+sp_columns = ['symbol','last','change','high','low','group']
+filter_columns_sp = ['Symbol', 'LastPrice', 'VariationRate', 'MaxPrice', 'MinPrice', 'Panel']
+numeric_columns_sp = ['last', 'high', 'low','change']
+
+options_columns = ['symbol', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'expiration', 'strike', 'kind', 'underlying_asset']
+filter_columns_options = ['Symbol', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'MaturityDate', 'StrikePrice', 'PutOrCall', 'Issuer']
+numeric_columns_options = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close', 'strike']
+
+personal_portfolio_index = ['symbol', 'settlement']
+personal_portfolio_columns = ['symbol', 'settlement', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'expiration', 'strike', 'kind', 'underlying_asset', 'close']
+filter_columns_personal_portfolio = ['Symbol', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'MaturityDate', 'StrikePrice', 'PutOrCall', 'Issuer', 'ClosePrice']
+numeric_columns_personal_portfolio = ['last', 'close', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_size', 'bid', 'ask_size', 'ask', 'previous_close', 'strike']
+
+repos_index = ['symbol', 'settlement']
+repos_columns = ['symbol', 'days', 'settlement', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime', 'close']
+filter_columns_repos = ['Symbol', 'CantDias', 'Term', 'BuyQuantity', 'BuyPrice', 'SellPrice', 'SellQuantity', 'LastPrice', 'VariationRate', 'StartPrice', 'MaxPrice', 'MinPrice', 'PreviousClose', 'TotalAmountTraded', 'TotalQuantityTraded', 'Trades', 'TradeDate', 'ClosePrice']
+numeric_columns_repos = ['last', 'open', 'high', 'low', 'volume', 'turnover', 'operations', 'change', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount', 'previous_close', 'close']
+
+account_columns = ["IMPO", "ESPE", "TESP", "NERE", "GTOS", "DETA", "TIPO", "Hora", "AMPL", "DIVI", "TICK", "CANT", "PCIO", "CAN3", "CAN2", "CAN0"]
+numeric_columns_account = ["IMPO", "GTOS", "CANT", "PCIO", "CAN3", "CAN2", "CAN0"]
+
+# Panel name sent to /Prices/GetByPanel -> SHDA method that downloads it
+snapshot_panels = {
+    'accionesLideres': 'get_bluechips',
+    'panelGeneral': 'get_galpones',
+    'cedears': 'get_cedear',
+    'rentaFija': 'get_bonds',
+    'letes': 'get_short_term_bonds',
+    'obligaciones': 'get_corporate_bonds',
+    'opciones': 'get_options',
+    'indices': 'get_MERVAL',
+    'cauciones': 'get_repos'}
+snapshot_settled_panels = ['accionesLideres', 'panelGeneral', 'cedears', 'rentaFija', 'letes', 'obligaciones']
+snapshot_columns = ['panel', 'symbol', 'settlement', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'close', 'turnover', 'volume', 'operations', 'datetime', 'group', 'expiration', 'strike', 'kind', 'underlying_asset', 'days', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount']
+snapshot_numeric_columns = ['bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 'high', 'low', 'previous_close', 'close', 'turnover', 'volume', 'operations', 'strike', 'days', 'bid_amount', 'bid_rate', 'ask_rate', 'ask_amount']
+snapshot_datetime_columns = ['datetime', 'expiration']
+
+stream_index = ['symbol', 'settlement']
+stream_columns = ['bid_size', 'bid', 'ask', 'ask_size', 'last', 'volume']
+
+portfolio_proceso_map = {"ARS": 10, "USD": 91}
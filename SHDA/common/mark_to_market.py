@@ -0,0 +1,166 @@
+import threading
+
+from . import maps
+from .lazy import LazyModule
+from .records import board_stocks, stock_columns, convert_column, to_float
+
+pd = LazyModule('pandas')
+
+
+class MarkToMarket:
+    """
+    Live valuation of the holdings of many accounts.
+
+    Holdings come from SHDA.account or Portfolio.by_date and prices from
+    GetByPanel responses, usually through SHDA(mark_to_market=...). Every
+    account keeps its value, cost and PnL as running totals and every
+    symbol the positions that hold it, so a poll only recomputes the
+    positions whose price changed and adjusts their accounts by the
+    difference. The price is the last trade, or the previous close while
+    the instrument has not traded, of the securities boards with the given
+    settlement and of the options board. Indices and cauciones are never
+    applied, their last is an index level or a rate. Positions without a
+    symbol (cash) are not valued.
+    """
+
+    columns = ['symbol', 'position_size', 'position_price', 'price', 'value', 'pnl']
+    # Boards whose last is a price; the options board has no settlement
+    panels = maps.snapshot_settled_panels + ['opciones']
+
+    def __init__(self, settlement='48hs'):
+        self.settlement = settlement
+        self.__positions = {}
+        self.__totals = {}
+        self.__by_symbol = {}
+        self.__prices = {}
+        self.__changed = set()
+        self.__lock = threading.Lock()
+
+    @property
+    def accounts(self):
+        return list(self.__positions)
+
+    @property
+    def changed(self):
+        """Accounts whose valuation changed in the last update."""
+
+        return set(self.__changed)
+
+    def set_holdings(self, account, holdings):
+        """
+        Replaces the positions of account with a frame of SHDA.account
+        (TICK, CANT, CAN0) or Portfolio.by_date (symbol, position_size,
+        position_price), valued at the last known prices.
+        """
+
+        if 'symbol' not in holdings.columns:
+            holdings = holdings.rename(columns={'TICK': 'symbol', 'CANT': 'position_size', 'CAN0': 'position_price'})
+
+        rows = holdings[['symbol', 'position_size', 'position_price']].itertuples(index=False)
+        positions = []
+        for symbol, size, cost in rows:
+            if not isinstance(symbol, str) or not symbol:
+                continue
+            positions.append([symbol, to_float(size) or 0.0, to_float(cost) or 0.0, None, None])
+
+        with self.__lock:
+            self.__remove(account)
+            self.__positions[account] = positions
+            totals = self.__totals[account] = {'value': 0.0, 'cost': 0.0, 'unpriced': len(positions)}
+            for position in positions:
+                self.__by_symbol.setdefault(position[0], []).append((account, position))
+                price = self.__prices.get(position[0])
+                if price is not None:
+                    self.__reprice(totals, position, price)
+
+    def remove(self, account):
+        with self.__lock:
+            self.__remove(account)
+
+    def update(self, data, settlement=None, panel=None):
+        """
+        Applies a decoded GetByPanel response and returns how many positions
+        were recomputed. Only securities boards requested with the same
+        settlement and the options board (panel='opciones') are applied;
+        without panel, the board must have been requested with the same
+        settlement.
+        """
+
+        if panel is not None and panel not in self.panels:
+            return 0
+        if settlement != self.settlement and not (panel == 'opciones' and settlement is None):
+            return 0
+
+        stocks = board_stocks(data)
+        if not stocks:
+            return 0
+
+        columns = stock_columns(stocks, ['Symbol', 'LastPrice', 'PreviousClose'], ['symbol', 'last', 'previous_close'])
+        last = convert_column(columns['last'], to_float)
+        previous_close = convert_column(columns['previous_close'], to_float)
+        return self.update_prices({symbol: price if price is not None else close for symbol, price, close in zip(columns['symbol'], last, previous_close)})
+
+    def update_prices(self, prices):
+        """Applies a dict symbol -> price and returns how many positions were recomputed."""
+
+        count = 0
+        changed = set()
+        with self.__lock:
+            for symbol, price in prices.items():
+                if price is None or self.__prices.get(symbol) == price:
+                    continue
+                self.__prices[symbol] = price
+                for account, position in self.__by_symbol.get(symbol, ()):
+                    self.__reprice(self.__totals[account], position, price)
+                    changed.add(account)
+                    count += 1
+            self.__changed = changed
+        return count
+
+    def valuation(self, account):
+        """
+        Value and cost of the priced positions of account, their PnL, and
+        the number of positions without a price yet.
+        """
+
+        with self.__lock:
+            return self.__valuation(self.__totals[account])
+
+    def valuations(self):
+        """Valuation of every account as a DataFrame indexed by account."""
+
+        with self.__lock:
+            totals = {account: self.__valuation(values) for account, values in self.__totals.items()}
+        return pd.DataFrame.from_dict(totals, orient='index', columns=['value', 'cost', 'pnl', 'unpriced']).rename_axis('account')
+
+    def positions(self, account):
+        """Positions of account with their current price, value and PnL."""
+
+        with self.__lock:
+            rows = [(symbol, size, cost, price, value, None if value is None else value - size * cost) for symbol, size, cost, value, price in self.__positions[account]]
+        return pd.DataFrame(rows, columns=self.columns)
+
+    def __valuation(self, totals):
+        return {'value': totals['value'], 'cost': totals['cost'], 'pnl': totals['value'] - totals['cost'], 'unpriced': totals['unpriced']}
+
+    def __reprice(self, totals, position, price):
+        # position is [symbol, size, cost price, value, price]
+        value = position[1] * price
+        if position[3] is None:
+            totals['unpriced'] -= 1
+            totals['cost'] += position[1] * position[2]
+            totals['value'] += value
+        else:
+            totals['value'] += value - position[3]
+        position[3] = value
+        position[4] = price
+
+    def __remove(self, account):
+
+        for position in self.__positions.pop(account, ()):
+            holders = self.__by_symbol.get(position[0], [])
+            holders[:] = [holder for holder in holders if holder[0] != account]
+            if not holders:
+                self.__by_symbol.pop(position[0], None)
+        self.__totals.pop(account, None)
+        self.__changed.discard(account)
@@ -0,0 +1,201 @@
+from . import maps, records
+from .helpers import convert_to_numeric_columns
+from .lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+
+def _trade_datetime(df):
+    return pd.to_datetime(df.TradeDate, format='%Y%m%d', errors='coerce') + pd.to_timedelta(df.Hour, errors='coerce')
+
+def _stocks(data):
+    return data['Result']['Stocks'] if data['Result'] and data['Result']['Stocks'] else []
+
+def parse_securities(data, settlement):
+
+    df = pd.DataFrame(_stocks(data))
+    if df.empty:
+        return pd.DataFrame(columns=maps.securities_columns)
+
+    df.TradeDate = _trade_datetime(df)
+    df = df[maps.filter_columns].copy()
+    df.columns = maps.securities_columns
+    df = convert_to_numeric_columns(df, maps.numeric_columns)
+    df.group = df.group.apply(lambda x: maps.boards[x] if x in maps.boards else maps.boards[0])
+    df.settlement = settlement
+    return df
+
+def concat_securities(frames):
+
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=maps.securities_columns)
+
+def parse_options(data):
+
+    df = pd.DataFrame(_stocks(data))
+    if df.empty:
+        return pd.DataFrame(columns=maps.options_columns).set_index(['symbol'])
+
+    df.TradeDate = _trade_datetime(df)
+    df.MaturityDate = pd.to_datetime(df.MaturityDate, format='%Y%m%d', errors='coerce')
+    df.PutOrCall = df.PutOrCall.apply(lambda x: maps.call_put_map[x] if x in maps.call_put_map else maps.call_put_map[0])
+
+    df = df[maps.filter_columns_options].copy()
+    df.columns = maps.options_columns
+
+    df = convert_to_numeric_columns(df, maps.numeric_columns_options)
+    df = df[df.strike > 0].copy() # Remove non options rows
+    return df
+
+def parse_indices(data):
+
+    df = pd.DataFrame(_stocks(data))
+    if df.empty:
+        return pd.DataFrame(columns=maps.sp_columns)
+
+    df = df[maps.filter_columns_sp].copy()
+    df.columns = maps.sp_columns
+    df = convert_to_numeric_columns(df, maps.numeric_columns_sp)
+    return df
+
+def parse_personal_portfolio(data):
+
+    df = pd.DataFrame(data['Result'])
+    if df.empty:
+        return pd.DataFrame(columns=maps.personal_portfolio_columns).set_index(maps.personal_portfolio_index)
+
+    numeric_options_columns = ['MaturityDate', 'StrikePrice']
+    alpha_option_columns = ['PutOrCall', 'Issuer']
+
+    df.TradeDate = _trade_datetime(df)
+    df[alpha_option_columns + numeric_options_columns] = df[alpha_option_columns + numeric_options_columns].astype(object)
+    df.loc[df.StrikePrice == 0, alpha_option_columns] = ''
+    df.loc[df.StrikePrice == 0, numeric_options_columns] = np.nan
+    df.MaturityDate = pd.to_datetime(df.MaturityDate, format='%Y%m%d', errors='coerce')
+    df.PutOrCall = df.PutOrCall.apply(lambda x: maps.call_put_map[x] if x in maps.call_put_map else maps.call_put_map[0])
+    df.Term = df.Term.apply(lambda x: maps.settlements_int_map[x] if x in maps.settlements_int_map else '')
+    df = df[maps.filter_columns_personal_portfolio].copy()
+    df.columns = maps.personal_portfolio_columns
+    df = convert_to_numeric_columns(df, maps.numeric_columns_personal_portfolio)
+    return df
+
+def parse_repos(data):
+
+    df = pd.DataFrame(_stocks(data))
+    if df.empty:
+        return pd.DataFrame(columns=maps.repos_columns).set_index(maps.repos_index)
+
+    df.TradeDate = _trade_datetime(df)
+    df = df[maps.filter_columns_repos].copy()
+    df.columns = maps.repos_columns
+    df = convert_to_numeric_columns(df, maps.numeric_columns_repos)
+    df = df.set_index(maps.repos_index)
+    return df
+
+def parse_daily_history(data):
+
+    # A span without bars (a weekend, before the open) comes as {'s': 'no_data'}
+    if data.get('s') == 'no_data' or not data.get('t'):
+        return pd.DataFrame({'date': pd.Series(dtype=object), 'open': pd.Series(dtype='float64'), 'high': pd.Series(dtype='float64'),
+                             'low': pd.Series(dtype='float64'), 'close': pd.Series(dtype='float64'), 'volume': pd.Series(dtype=int)})
+
+    df = pd.DataFrame({'date': data['t'], 'open': data['o'], 'high': data['h'], 'low': data['l'], 'close': data['c'], 'volume': data['v']})
+    df.date = pd.to_datetime(df.date, unit='s').dt.date
+    df.volume = df.volume.astype(int)
+    return df
+
+def parse_intraday_history(data):
+
+    # A range without bars comes as {'s': 'no_data'}
+    df = pd.DataFrame({'datetime': data.get('t') or [], 'open': data.get('o') or [], 'high': data.get('h') or [], 'low': data.get('l') or [], 'close': data.get('c') or [], 'volume': data.get('v') or []})
+    df.datetime = pd.to_datetime(df.datetime.astype('int64'), unit='s', utc=True)
+    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype('float64')
+    df.volume = df.volume.astype('int64')
+    return df
+
+def concat_daily_history(frames, symbols):
+
+    df = pd.concat([frame.assign(symbol=symbol) for frame, symbol in zip(frames, symbols)], ignore_index=True) if frames else pd.DataFrame(columns=['symbol', 'date', 'open', 'high', 'low', 'close', 'volume'])
+    df.symbol = pd.Categorical(df.symbol, categories=list(dict.fromkeys(symbols)))
+    df.date = pd.to_datetime(df.date)
+    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype('float64')
+    df.volume = df.volume.astype('int64')
+    return df.set_index(['symbol', 'date']).sort_index()
+
+def parse_account(data):
+
+    columns, index = records.account_columns(data)
+    numeric = set(maps.numeric_columns_account)
+    return pd.DataFrame({name: np.array(values, dtype='float64' if name in numeric else object)
+                         for name, values in columns.items()}, index=index)
+
+def parse_portfolio_by_date(data):
+
+    # Inicializar una lista para almacenar los activos procesados
+    activos = []
+
+    # Iterar sobre los activos obtenidos de la respuesta
+    for activo in data['Result']['Activos']:
+        for subtotal in activo['Subtotal']:
+            # Crear un diccionario con los datos relevantes del activo y su subtotal
+            activo_data = {
+                'symbol': subtotal['TICK'],
+                'description': subtotal['AMPL'],
+                'position_size': subtotal['CANT'],
+                'position_price': subtotal['CAN0'],
+                'date_close': subtotal['PCIO'],
+                'position': subtotal['IMPO'],
+                'PNL': subtotal['GTOS'],
+                'group': activo['ESPE'],
+            }
+            # Agregar los datos procesados del activo a la lista
+            activos.append(activo_data)
+
+    # Convertir la lista de activos en un DataFrame de pandas
+    activos_df = pd.DataFrame(activos, columns=['symbol', 'description', 'position_size', 'position_price', 'date_close', 'position', 'PNL', 'group'])
+
+    tenencia_disponible = next(
+            (item["IMPO"] for item in data["Result"]["Activos"] if item["ESPE"] == "Cuenta Corriente"),
+            None
+        )
+
+    activos_df.loc[activos_df['group'] == 'Cuenta Corriente', 'position'] = tenencia_disponible
+    activos_df.loc[activos_df['group'] == 'Cuenta Corriente', 'description'] = "Liquidez"
+    return activos_df
+
+def concat_by_comitente(frames, comitentes):
+
+    if not frames:
+        return pd.DataFrame(index=pd.Index([], name='comitente'))
+
+    df = pd.concat(frames, keys=comitentes, names=['comitente', None])
+    return df.droplevel(1)
+
+def concat_by_date(frames, dates):
+
+    if not frames:
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=['date', 'symbol']))
+
+    df = pd.concat(frames, keys=dates, names=['date', None])
+    return df.droplevel(1).set_index('symbol', append=True)
+
+def parse_snapshot(frames):
+
+    frames = [frame for frame in frames if not frame.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    df = df.reindex(columns=maps.snapshot_columns)
+    df[maps.snapshot_numeric_columns] = df[maps.snapshot_numeric_columns].astype(float)
+    for col in maps.snapshot_datetime_columns:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+def snapshot_panel(df, panel):
+
+    if any(name is not None for name in df.index.names):
+        df = df.reset_index()
+    if 'settlement' not in df.columns:
+        df['settlement'] = ''
+
+    df.insert(0, 'panel', panel)
+    return df
@@ -0,0 +1,221 @@
+import datetime
+from html.parser import HTMLParser
+from . import maps
+from .brokers import brokers
+from .exceptions import BrokerNotSupportedException
+
+
+def home_headers(host):
+    return {
+        "Host" : f"{host}",
+        "User-Agent" : maps.user_agent,
+        "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language" : "en-US,en;q=0.5",
+        "Accept-Encoding" : "gzip, deflate",
+        "DNT" : "1",
+        "Connection" : "keep-alive",
+        "Upgrade-Insecure-Requests" : "1",
+        "Sec-Fetch-Dest" : "document",
+        "Sec-Fetch-Mode" : "navigate",
+        "Sec-Fetch-Site" : "none",
+        "Sec-Fetch-User" : "?1"
+    }
+
+def login_headers(host):
+    return {
+        "Host" : f"{host}",
+        "User-Agent" : maps.user_agent,
+        "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language" : "en-US,en;q=0.5",
+        "Accept-Encoding" : "gzip, deflate",
+        "Content-Type" : "application/x-www-form-urlencoded",
+        "Origin" : f"https://{host}/",
+        "DNT" : "1",
+        "Connection" : "keep-alive",
+        "Referer" : f"https://{host}/",
+        "Upgrade-Insecure-Requests" : "1",
+        "Sec-Fetch-Dest" : "document",
+        "Sec-Fetch-Mode" : "navigate",
+        "Sec-Fetch-Site" : "same-origin",
+        "Sec-Fetch-User" : "?1",
+        "TE" : "trailers"
+    }
+
+def prices_headers(host):
+    return {
+        "Accept" : "application/json, text/javascript, */*; q=0.01",
+        "Accept-Encoding" : "gzip, deflate",
+        "Accept-Language" : "en-US,en;q=0.5",
+        "Connection" : "keep-alive",
+        "Content-Type" : "application/json; charset=utf-8",
+        "DNT" : "1",
+        "Host" : f"{host}",
+        "Origin" : f"https://{host}",
+        "Referer" : f"https://{host}/Prices/Stocks",
+        "Sec-Fetch-Dest" : "empty",
+        "Sec-Fetch-Mode" : "cors",
+        "Sec-Fetch-Site" : "same-origin",
+        "TE" : "trailers",
+        "User-Agent" : maps.user_agent,
+        "X-Requested-With" : "XMLHttpRequest"
+    }
+
+def history_headers():
+    return {
+        'User-Agent': maps.user_agent,
+        'Accept-Encoding': 'gzip, deflate',
+        'Content-Type': 'application/x-www-form-urlencoded'
+    }
+
+def login_data(dni, user, password):
+    return {
+        "IpAddress": "",
+        "Dni": dni,
+        "Usuario": user,
+        "Password": password
+    }
+
+def panel_data(panel, settlement=None):
+    term = '' if settlement is None else str(maps.settlements_map[settlement])
+    return '{"panel":"'+panel+'","term":"'+term+'"}'
+
+def account_data(comitente):
+    return {'comitente': str(comitente),
+        'consolida': '0',
+        'proceso': '22',
+        'fechaDesde': None,
+        'fechaHasta': None,
+        'tipo': None,
+        'especie': None,
+        'comitenteMana': None}
+
+def portfolio_by_date_data(comitente, date, moneda):
+
+    # Convertir la fecha en un objeto datetime
+    try:
+        date = datetime.datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"La fecha '{date}' no tiene el formato correcto (YYYY-MM-DD).")
+
+    # Formatear la fecha al formato "DD/MM/YYYY"
+    date = date.strftime("%d/%m/%Y")
+
+    # Validar que la moneda sea válida
+    if moneda not in maps.portfolio_proceso_map:
+        raise ValueError(f"Moneda '{moneda}' no válida.")
+
+    return {
+        "comitente": str(comitente),
+        "consolida": "0",
+        "proceso": str(maps.portfolio_proceso_map.get(moneda)),
+        "fechaDesde": str(date),
+        "tipo": "00"
+    }
+
+def history_url(host, symbol, from_date, to_date, resolution='D', scheme='https'):
+    return scheme + '://{}/HistoricoPrecios/history?symbol={}&resolution={}&from={}&to={}'.format(
+        host,
+        symbol.upper(),
+        resolution,
+        convert_datetime_to_epoch(from_date),
+        convert_datetime_to_epoch(to_date))
+
+def intraday_resolution(resolution):
+    # Minutes per bar, as the history endpoint expects it ('1', '5', '60'...)
+    try:
+        minutes = int(resolution)
+    except (TypeError, ValueError):
+        minutes = 0
+    if minutes <= 0 or str(resolution).strip() != str(minutes):
+        raise ValueError('Intraday resolution must be a number of minutes, got {!r}'.format(resolution))
+    return str(minutes)
+
+def market_day_start(now=None):
+    # Midnight of the current day in Buenos Aires (UTC-3, no DST), as epoch seconds
+    market_time = datetime.timezone(datetime.timedelta(hours=-3))
+    now = datetime.datetime.now(market_time) if now is None else datetime.datetime.fromtimestamp(convert_datetime_to_epoch(now), market_time)
+    return int(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+def convert_datetime_to_epoch(dt):
+
+    # Epoch seconds and aware datetimes are absolute, naive ones are UTC
+    if isinstance(dt, (int, float)):
+        return int(dt)
+    if isinstance(dt, str):
+        dt = datetime.datetime.strptime(dt, '%Y-%m-%d')
+    elif not isinstance(dt, datetime.datetime):
+        dt = datetime.datetime(dt.year, dt.month, dt.day)
+    elif dt.tzinfo is not None:
+        return int(dt.timestamp())
+
+    dt_zero = datetime.datetime(1970, 1, 1)
+    time_delta = dt - dt_zero
+    return int(time_delta.total_seconds())
+
+def base_url(broker_data):
+    return '{}://{}'.format(broker_data.get('scheme', 'https'), broker_data['page'])
+
+class _LoginPageParser(HTMLParser):
+    # Only needs #usuarioLogueado and the text of .callout-danger, the
+    # standard library parser is enough and spares importing lxml at login.
+
+    void_tags = ('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr')
+
+    def __init__(self):
+        super().__init__()
+        self.logged_in = False
+        self.errors = []
+        self.__depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get('id') == 'usuarioLogueado':
+            self.logged_in = True
+        if self.__depth:
+            # Tags break words, as in the text pyquery used to return
+            self.errors[-1] += ' '
+        if tag in self.void_tags:
+            return
+        if self.__depth:
+            self.__depth += 1
+        elif 'callout-danger' in (attrs.get('class') or '').split():
+            self.__depth = 1
+            self.errors.append('')
+
+    def handle_endtag(self, tag):
+        if self.__depth and tag not in self.void_tags:
+            self.errors[-1] += ' '
+            self.__depth -= 1
+
+    def handle_data(self, data):
+        if self.__depth:
+            self.errors[-1] += data
+
+def check_login(text):
+
+    parser = _LoginPageParser()
+    parser.feed(text)
+    parser.close()
+    if not parser.logged_in:
+        errormsg = ' '.join(' '.join(error.split()) for error in parser.errors).strip()
+        if errormsg:
+            return errormsg
+
+        return 'Session cannot be created.  Check the entered information and try again.'
+
+    return None
+
+def get_broker_data(broker_id):
+
+    # A dict with the same keys as the brokers list ('page' and optionally
+    # 'scheme') points the clients to any host, e.g. a local stub server.
+    if isinstance(broker_id, dict):
+        return broker_id
+
+    broker_data = [broker for broker in brokers if broker['broker_id'] == broker_id]
+
+    if not broker_data:
+        supported_brokers = ''.join([str(broker['broker_id']) + ', ' for broker in brokers])[0:-2]
+        raise BrokerNotSupportedException('Broker not supported.  Brokers supported: {}.'.format(supported_brokers))
+
+    return broker_data[0]
@@ -0,0 +1,148 @@
+import threading
+
+from . import maps
+from .lazy import LazyModule
+from .records import Quote, int_columns, board_stocks, stock_columns, convert_column, to_float, trade_datetime
+
+np = LazyModule('numpy')
+
+
+class QuoteBook:
+    """
+    Latest top of book of every instrument seen in GetByPanel responses.
+
+    Prices live in a float64 NumPy array with one column per field (NaN
+    when missing) and a dict maps (symbol, settlement) to its row, so every
+    response is written in place and lookups never scan or allocate a
+    DataFrame.
+    Instruments of panels without settlement (options, indices, repos)
+    are keyed with the Term sent by the broker ('48hs'...), '' when there
+    is none.
+    """
+
+    columns = [name for name in maps.securities_columns if name in maps.numeric_columns]
+    source_columns = ['Symbol', 'Term', 'Panel'] + [maps.filter_columns[maps.securities_columns.index(name)] for name in columns]
+
+    def __init__(self, capacity=1024):
+        self.__index = {}
+        self.__symbols = []
+        self.__settlements = []
+        self.__groups = []
+        self.__size = 0
+        self.__capacity = max(1, capacity)
+        self.__positions = {name: i for i, name in enumerate(self.columns)}
+        self.__int_positions = [i for i, name in enumerate(self.columns) if name in int_columns]
+        self.__values = np.full((self.__capacity, len(self.columns)), np.nan)
+        self.__datetime = np.full(self.__capacity, np.datetime64('NaT'), dtype='datetime64[s]')
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return self.__size
+
+    def __contains__(self, key):
+        return key in self.__index
+
+    def keys(self):
+        return list(zip(self.__symbols, self.__settlements))
+
+    def update(self, data, settlement=None):
+        """
+        Writes a decoded GetByPanel response into the book. settlement is
+        the one the board was requested with; None keys every row by the
+        Term it came with.
+        """
+
+        stocks = board_stocks(data)
+        if not stocks:
+            return 0
+
+        values = stock_columns(stocks, self.source_columns, ['symbol', 'term', 'group'] + self.columns)
+        settlements = [settlement] * len(stocks) if settlement is not None else [maps.settlements_int_map.get(term, term or '') for term in values['term']]
+        datetimes = np.array([trade_datetime(stock.get('TradeDate'), stock.get('Hour')) for stock in stocks], dtype='datetime64[s]')
+        converted = np.column_stack([np.array(convert_column(values[name], to_float), dtype=np.float64) for name in self.columns])
+
+        with self.__lock:
+            rows = np.empty(len(stocks), dtype=np.intp)
+            for i, key in enumerate(zip(values['symbol'], settlements)):
+                row = self.__index.get(key)
+                if row is None:
+                    row = self.__add(key, maps.boards.get(values['group'][i], maps.boards[0]))
+                rows[i] = row
+
+            self.__values[rows] = converted
+            self.__datetime[rows] = datetimes
+
+        return len(stocks)
+
+    def get(self, symbol, settlement='48hs'):
+        """Quote of one instrument, or None when it is not in the book."""
+
+        row = self.__index.get((symbol, settlement))
+        if row is None:
+            return None
+
+        prices = self.__values[row].tolist()
+        for i in self.__int_positions:
+            if prices[i] == prices[i]:
+                prices[i] = int(prices[i])
+        prices = [None if value != value else value for value in prices]
+        return Quote(symbol, settlement, *prices, self.__datetime[row].item(), self.__groups[row])
+
+    def get_many(self, keys, columns=None):
+        """
+        Vectorized lookup of many (symbol, settlement) keys. Returns a dict
+        column -> NumPy array aligned with keys, NaN for unknown keys.
+        """
+
+        index = self.__index
+        rows = np.fromiter((index.get(tuple(key), -1) for key in keys), dtype=np.intp)
+        missing = rows < 0
+        rows[missing] = 0
+
+        result = {}
+        for name in (columns or self.columns):
+            values = self.__datetime[rows] if name == 'datetime' else self.__values[rows, self.__positions[name]]
+            values[missing] = np.datetime64('NaT') if name == 'datetime' else np.nan
+            result[name] = values
+        return result
+
+    def column(self, name):
+        """Read only view of one column, aligned with keys() until the book grows."""
+
+        values = self.__datetime[:self.__size] if name == 'datetime' else self.__values[:self.__size, self.__positions[name]]
+        values.flags.writeable = False
+        return values
+
+    def clear(self):
+        with self.__lock:
+            self.__index.clear()
+            self.__symbols.clear()
+            self.__settlements.clear()
+            self.__groups.clear()
+            self.__size = 0
+            self.__values.fill(np.nan)
+            self.__datetime.fill(np.datetime64('NaT'))
+
+    def __add(self, key, group):
+
+        if self.__size == self.__capacity:
+            self.__grow()
+
+        row = self.__size
+        self.__index[key] = row
+        self.__symbols.append(key[0])
+        self.__settlements.append(key[1])
+        self.__groups.append(group)
+        self.__size += 1
+        return row
+
+    def __grow(self):
+
+        capacity = self.__capacity * 2
+        grown = np.full((capacity, len(self.columns)), np.nan)
+        grown[:self.__capacity] = self.__values
+        self.__values = grown
+        grown = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[s]')
+        grown[:self.__capacity] = self.__datetime
+        self.__datetime = grown
+        self.__capacity = capacity
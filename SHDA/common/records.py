@@ -0,0 +1,237 @@
+import datetime
+from collections import namedtuple
+
+from . import maps
+
+
+Quote = namedtuple('Quote', maps.securities_columns)
+Quote.__doc__ = """
+Top of book of one instrument from a GetByPanel board. Prices are floats,
+sizes, volume and operations ints, and missing values ('-' in the board)
+are None.
+"""
+
+# Columns kept as int, every other numeric column is a float
+int_columns = ('bid_size', 'ask_size', 'volume', 'operations')
+
+# Type of every column built by the *_columns functions, for the columnar backends
+column_types = dict(
+    {name: 'string' for name in ('panel', 'symbol', 'settlement', 'group', 'kind', 'underlying_asset', 'moneda')},
+    datetime='timestamp', expiration='timestamp', date='date', days='int',
+    **{name: 'int' for name in int_columns})
+
+def to_float(value):
+
+    if value.__class__ is str:
+        if not value or value == '-':
+            return None
+        return float(value.replace('.', '').replace(',', '.'))
+    return None if value is None else float(value)
+
+def to_int(value):
+
+    if value.__class__ is str:
+        if not value or value == '-':
+            return None
+        value = value.replace('.', '')
+        return int(value) if ',' not in value else int(float(value.replace(',', '.')))
+    return None if value is None else int(value)
+
+def convert_column(values, convert):
+    """
+    to_float/to_int over a whole column: Argentine formatted strings are
+    rewritten in a single joined string and parsed by map(), values are
+    converted one by one only when the column has missing or typed values.
+    """
+
+    if not values:
+        return []
+    try:
+        text = '\n'.join(values)
+    except TypeError:
+        return [convert(value) for value in values]
+
+    try:
+        if convert is to_int:
+            return list(map(int, text.replace('.', '').split('\n')))
+        return list(map(float, text.replace('.', '').replace(',', '.').split('\n')))
+    except ValueError:
+        return [convert(value) for value in values]
+
+def trade_datetime(date, hour):
+
+    try:
+        return datetime.datetime(int(date[:4]), int(date[4:6]), int(date[6:8]), int(hour[:2]), int(hour[3:5]), int(hour[6:8]))
+    except (TypeError, ValueError):
+        return None
+
+def to_date(value):
+
+    try:
+        return datetime.datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    except (TypeError, ValueError):
+        return None
+
+def board_stocks(data):
+    return data['Result']['Stocks'] if data['Result'] and data['Result']['Stocks'] else []
+
+def _convert_numeric(columns, numeric_columns):
+    for name in numeric_columns:
+        columns[name] = convert_column(columns[name], to_int if name in int_columns else to_float)
+
+def filter_rows(columns, keep):
+    return {name: [value for value, flag in zip(values, keep) if flag] for name, values in columns.items()}
+
+def stock_columns(stocks, filter_columns, columns):
+    """
+    Pure Python equivalent of df[filter_columns] with the columns renamed:
+    returns a dict column -> list of raw values, in the order of columns.
+    """
+
+    return {name: [stock.get(key) for stock in stocks] for key, name in zip(filter_columns, columns)}
+
+def securities_columns(data, settlement):
+    """
+    Decoded GetByPanel response as a dict column -> list of values, typed
+    like the DataFrame of parse_securities but without pandas.
+    """
+
+    stocks = board_stocks(data)
+    columns = stock_columns(stocks, maps.filter_columns, maps.securities_columns)
+
+    _convert_numeric(columns, maps.numeric_columns)
+    columns['datetime'] = [trade_datetime(stock.get('TradeDate'), stock.get('Hour')) for stock in stocks]
+    columns['group'] = [maps.boards.get(panel, maps.boards[0]) for panel in columns['group']]
+    columns['settlement'] = [settlement] * len(stocks)
+    return columns
+
+def parse_quotes(data, settlement):
+    return list(map(Quote._make, zip(*securities_columns(data, settlement).values())))
+
+def options_columns(data):
+
+    stocks = board_stocks(data)
+    columns = stock_columns(stocks, maps.filter_columns_options, maps.options_columns)
+
+    _convert_numeric(columns, maps.numeric_columns_options)
+    columns['datetime'] = [trade_datetime(stock.get('TradeDate'), stock.get('Hour')) for stock in stocks]
+    columns['expiration'] = [to_date(value) for value in columns['expiration']]
+    columns['kind'] = [maps.call_put_map.get(value, maps.call_put_map[0]) for value in columns['kind']]
+
+    # Remove non options rows
+    return filter_rows(columns, [strike is not None and strike > 0 for strike in columns['strike']])
+
+def indices_columns(data):
+
+    columns = stock_columns(board_stocks(data), maps.filter_columns_sp, maps.sp_columns)
+    _convert_numeric(columns, maps.numeric_columns_sp)
+    return columns
+
+def personal_portfolio_columns(data):
+
+    stocks = data['Result'] or []
+    columns = stock_columns(stocks, maps.filter_columns_personal_portfolio, maps.personal_portfolio_columns)
+
+    # Rows that are not options have no option fields
+    option = [strike not in (0, None) for strike in columns['strike']]
+    columns['expiration'] = [to_date(value) if flag else None for value, flag in zip(columns['expiration'], option)]
+    columns['strike'] = [value if flag else None for value, flag in zip(columns['strike'], option)]
+    columns['kind'] = [maps.call_put_map.get(value, maps.call_put_map[0]) if flag else '' for value, flag in zip(columns['kind'], option)]
+    columns['underlying_asset'] = [value if flag else '' for value, flag in zip(columns['underlying_asset'], option)]
+
+    _convert_numeric(columns, maps.numeric_columns_personal_portfolio)
+    columns['datetime'] = [trade_datetime(stock.get('TradeDate'), stock.get('Hour')) for stock in stocks]
+    columns['settlement'] = [maps.settlements_int_map.get(value, '') for value in columns['settlement']]
+    return columns
+
+def repos_columns(data):
+
+    stocks = board_stocks(data)
+    columns = stock_columns(stocks, maps.filter_columns_repos, maps.repos_columns)
+
+    _convert_numeric(columns, maps.numeric_columns_repos)
+    # CantDias comes as a string or a number; as int, like the pandas snapshot casts it
+    columns['days'] = convert_column(columns['days'], to_int)
+    columns['datetime'] = [trade_datetime(stock.get('TradeDate'), stock.get('Hour')) for stock in stocks]
+    return columns
+
+def daily_history_columns(data):
+
+    epoch = datetime.date(1970, 1, 1)
+    return {
+        'date': [epoch + datetime.timedelta(seconds=t) for t in data.get('t') or []],
+        'open': [float(value) for value in data.get('o') or []],
+        'high': [float(value) for value in data.get('h') or []],
+        'low': [float(value) for value in data.get('l') or []],
+        'close': [float(value) for value in data.get('c') or []],
+        'volume': [int(value) for value in data.get('v') or []]}
+
+def intraday_history_columns(data):
+
+    utc = datetime.timezone.utc
+    return {
+        'datetime': [datetime.datetime.fromtimestamp(t, utc) for t in data.get('t') or []],
+        'open': [float(value) for value in data.get('o') or []],
+        'high': [float(value) for value in data.get('h') or []],
+        'low': [float(value) for value in data.get('l') or []],
+        'close': [float(value) for value in data.get('c') or []],
+        'volume': [int(value) for value in data.get('v') or []]}
+
+def _account_rows(data):
+    # (position, row) of every holding: the cash of the first group, then
+    # the Subtotal rows of the others numbered from 0 within their group
+    activos = data['Result']['Activos'] or []
+    if not activos:
+        return
+
+    yield 0, {'IMPO': to_float(activos[0].get('IMPO')), 'ESPE': 'Cash'}
+    numeric = maps.numeric_columns_account
+    for activo in activos[1:]:
+        for position, subtotal in enumerate(activo.get('Subtotal') or ()):
+            row = dict(subtotal)
+            for name in numeric:
+                if name in row:
+                    row[name] = to_float(row[name])
+            yield position, row
+
+def iter_account(data):
+    """
+    Holdings of a GetConsulta response one dict at a time, in the rows of
+    parse_account and with its numeric columns as floats, without building
+    the whole frame.
+    """
+
+    for _, row in _account_rows(data):
+        yield row
+
+def account_columns(data):
+    """
+    Holdings as a dict column -> list of values plus the row index of
+    parse_account, flattened in a single pass.
+    """
+
+    index = []
+    columns = {name: [] for name in maps.account_columns}
+    for size, (position, row) in enumerate(_account_rows(data)):
+        index.append(position)
+        for name in [name for name in row if name not in columns]:
+            columns[name] = [None] * size
+        for name, values in columns.items():
+            values.append(row.get(name))
+    return columns, index
+
+def concat_columns(frames, columns, keys=None, key_name=None):
+    """
+    Concatenates column dicts into one with the given columns, filling the
+    columns a frame does not have with None. With keys, adds a key_name
+    column holding the key of every frame.
+    """
+
+    result = {name: [] for name in ([key_name] if keys is not None else []) + list(columns)}
+    for i, frame in enumerate(frames):
+        size = len(next(iter(frame.values()))) if frame else 0
+        if keys is not None:
+            result[key_name].extend([keys[i]] * size)
+        for name in columns:
+            result[name].extend(frame[name] if name in frame else [None] * size)
+    return result
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def session_key(host, dni, user):
+    # The key identifies the login without writing the user ids in clear
+    return hashlib.sha256('{}|{}|{}'.format(host, dni, user).encode()).hexdigest()
+
+def dump_cookies(jar):
+    return [{'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+             'expires': cookie.expires, 'secure': cookie.secure, 'rest': dict(getattr(cookie, '_rest', {}))} for cookie in jar]
+
+def load_cookies(jar, cookies):
+    """Sets the not expired cookies in jar and returns how many were set."""
+
+    now = time.time()
+    count = 0
+    for cookie in cookies:
+        if cookie.get('expires') is not None and cookie['expires'] <= now:
+            continue
+        jar.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+                expires=cookie.get('expires'), secure=cookie.get('secure', False), rest=cookie.get('rest') or {})
+        count += 1
+    return count
+
+class SessionStore:
+    """
+    Keeps the broker session cookies of every login in a local JSON file
+    readable only by its owner (0600), so a new process can reuse the
+    session instead of logging in again. Passwords are never stored.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.__lock = threading.Lock()
+
+    def load(self, key):
+        entry = self.__read().get(key)
+        return entry['cookies'] if entry else None
+
+    def save(self, key, jar):
+        with self.__lock:
+            entries = self.__read()
+            entries[key] = {'saved_at': time.time(), 'cookies': dump_cookies(jar)}
+            self.__write(entries)
+
+    def clear(self, key=None):
+        with self.__lock:
+            entries = self.__read()
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+            self.__write(entries)
+
+    def __read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __write(self, entries):
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Created 0600 from the start, then swapped in atomically
+        tmp = '{}.{}.tmp'.format(self.path, os.getpid())
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+class KeyringSessionStore:
+    """
+    Same as SessionStore, but keeps the cookies in the system keyring
+    through the optional keyring package.
+    """
+
+    def __init__(self, service='SHDA'):
+        import keyring
+        self.__keyring = keyring
+        self.service = service
+
+    def load(self, key):
+        value = self.__keyring.get_password(self.service, key)
+        return json.loads(value)['cookies'] if value else None
+
+    def save(self, key, jar):
+        self.__keyring.set_password(self.service, key, json.dumps({'saved_at': time.time(), 'cookies': dump_cookies(jar)}))
+
+    def clear(self, key):
+        try:
+            self.__keyring.delete_password(self.service, key)
+        except self.__keyring.errors.PasswordDeleteError:
+            pass
@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from .exceptions import ServerException, SessionException
+from .lazy import LazyModule
+from . import instrumentation
+
+requests = LazyModule('requests')
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a broker host after failure_threshold
+    consecutive failures, and lets a single probe through once
+    recovery_timeout seconds have passed.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30):
+        self.__failure_threshold = failure_threshold
+        self.__recovery_timeout = recovery_timeout
+        self.__failures = 0
+        self.__opened_at = None
+        self.__lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self.__lock:
+            return self.__opened_at is not None and time.monotonic() - self.__opened_at < self.__recovery_timeout
+
+    def before_request(self, host):
+        with self.__lock:
+            if self.__opened_at is None:
+                return
+            if time.monotonic() - self.__opened_at < self.__recovery_timeout:
+                raise ServerException('Circuit open for {}, too many consecutive failures.'.format(host))
+            # Half open: let this request probe the host and re-arm the timeout
+            self.__opened_at = time.monotonic()
+
+    def record_success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__failures >= self.__failure_threshold:
+                self.__opened_at = time.monotonic()
+
+class Transport:
+    """
+    HTTP transport shared by SHDA and Portfolio.
+
+    Wraps a requests session with a sized connection pool, connect/read
+    timeouts, bounded retries with jittered exponential backoff for
+    idempotent calls and a circuit breaker per broker host. Failures are
+    raised as ServerException (or SessionException when the broker rejects
+    the session) instead of terminating the process.
+
+    When authenticate is set, a request whose session is rejected calls it
+    once and is sent again. Concurrent requests rejected by the same expired
+    session share a single call to authenticate.
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+    session_statuses = (401, 403)
+    login_path = '/Login'
+
+    def __init__(self, timeout=(5, 30), pool_connections=10, pool_maxsize=20, retries=3, backoff_factor=0.5, backoff_max=10, failure_threshold=5, recovery_timeout=30, session=None):
+        self.session = session if session is not None else requests.session()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+        self.__failure_threshold = failure_threshold
+        self.__recovery_timeout = recovery_timeout
+        self.__breakers = {}
+        self.__lock = threading.Lock()
+        self.authenticate = None
+        self.__generation = 0
+        self.__authenticate_lock = threading.Lock()
+
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, idempotent=True, **kwargs):
+        return self.request('GET', url, idempotent=idempotent, **kwargs)
+
+    def post(self, url, idempotent=False, **kwargs):
+        return self.request('POST', url, idempotent=idempotent, **kwargs)
+
+    def request(self, method, url, idempotent=True, reauthenticate=True, **kwargs):
+
+        generation = self.__generation
+        try:
+            return self.__request(method, url, idempotent, **kwargs)
+        except SessionException:
+            if not reauthenticate or self.authenticate is None:
+                raise
+        self.reauthenticate(generation)
+        return self.__request(method, url, idempotent, **kwargs)
+
+    def reauthenticate(self, generation=None):
+        """
+        Calls authenticate, unless another thread already did it after the
+        given generation was read.
+        """
+        with self.__authenticate_lock:
+            if generation is None or generation == self.__generation:
+                self.authenticate()
+                self.__generation += 1
+
+    def __request(self, method, url, idempotent=True, **kwargs):
+
+        host = urlparse(url).netloc
+        breaker = self.breaker(host)
+        attempts = self.retries + 1 if idempotent else 1
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(attempts):
+            breaker.before_request(host)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as ex:
+                # Connection errors and timeouts, but also bodies cut while
+                # being read (ChunkedEncodingError) or redirect loops
+                instrumentation.record_failure(time.perf_counter() - started)
+                breaker.record_failure()
+                error = ServerException('{} {}: {}'.format(method, url, ex))
+            else:
+                instrumentation.record_response(response, time.perf_counter() - started)
+                status = response.status_code
+                if status in self.session_statuses:
+                    breaker.record_success()
+                    raise SessionException('Session rejected by the broker ({}).'.format(status))
+                if status in self.retry_statuses:
+                    breaker.record_failure()
+                    error = ServerException('{} {}: {}'.format(method, url, status))
+                elif status >= 400:
+                    breaker.record_success()
+                    raise ServerException('{} {}: {}'.format(method, url, status))
+                else:
+                    breaker.record_success()
+                    if self.__redirected_to_login(url, response):
+                        raise SessionException('Session rejected by the broker (redirected to the login page).')
+                    return response
+
+            if attempt + 1 < attempts:
+                time.sleep(self.backoff(attempt))
+
+        raise error
+
+    def __redirected_to_login(self, url, response):
+        # Expired sessions are usually answered with a redirect to the login form
+        return bool(response.history) and self.login_path in urlparse(response.url).path and self.login_path not in urlparse(url).path
+
+    def backoff(self, attempt):
+        # Full jitter, so concurrent workers do not retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+    def breaker(self, host):
+        with self.__lock:
+            if host not in self.__breakers:
+                self.__breakers[host] = CircuitBreaker(self.__failure_threshold, self.__recovery_timeout)
+            return self.__breakers[host]
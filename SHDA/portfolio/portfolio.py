@@ -1,6 +1,7 @@
 import datetime
-import numpy as np
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from ..common import parsers, payloads, Transport, Instrumentation, HoldingsStore
+from ..common.instrumentation import timed, decode, bind
 
 class Portfolio:
     """
@@ -11,9 +12,12 @@ class Portfolio:
         headers (dict): Encabezados HTTP que se utilizan en las solicitudes a la API.
         host (str): Host o dominio donde se realiza la consulta.
         session (requests.Session): Sesión de solicitud HTTP que mantiene la persistencia entre las solicitudes.
+        transport (Transport): Transporte con timeouts, reintentos y circuit breaker usado para las solicitudes.
+        instrumentation (Instrumentation): Registro de tiempos y métricas de cada consulta.
+        holdings_store (HoldingsStore): Almacenamiento en disco de las fechas cerradas consultadas por by_range, o None.
     """
 
-    def __init__(self, headers, host, session):
+    def __init__(self, headers, host, session, transport=None, scheme="https", instrumentation=None, holdings_store=None):
         """
         Constructor de la clase Portfolio.
 
@@ -21,10 +25,18 @@ class Portfolio:
             headers (dict): Encabezados HTTP que se utilizan en las solicitudes a la API.
             host (str): Host o dominio donde se realiza la consulta.
             session (requests.Session): Sesión de solicitud HTTP.
+            transport (Transport, opcional): Transporte compartido con SHDA. Si no se indica se crea uno sobre session.
+            scheme (str, opcional): Esquema de la URL del broker, "https" por defecto.
+            instrumentation (Instrumentation, opcional): Instrumentación compartida con SHDA. Si no se indica se crea una propia.
+            holdings_store (str o HoldingsStore, opcional): Directorio o store donde by_range guarda las fechas cerradas.
         """
         self.__headers = headers
         self.__host = host
+        self.__url = f"{scheme}://{host}"
         self.__s = session
+        self.__t = transport if transport is not None else Transport(session=session)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self.holdings_store = HoldingsStore(holdings_store) if isinstance(holdings_store, str) else holdings_store
         
     def by_date(self, comitente, date, moneda):
         """
@@ -41,72 +53,105 @@ class Portfolio:
 
         Lanza:
             ValueError: Si la moneda no es válida o si la fecha no tiene el formato esperado.
+            ServerException: Si el broker no responde correctamente luego de los reintentos.
+            SessionException: Si el broker rechaza la sesión.
         """
-        
-        # Convertir la fecha en un objeto datetime
-        try:
-            date = datetime.datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise ValueError(f"La fecha '{date}' no tiene el formato correcto (YYYY-MM-DD).")
 
-        # Formatear la fecha al formato "DD/MM/YYYY"
-        date = date.strftime("%d/%m/%Y")
+        # Cargar los datos a consultar en un diccionario
+        payload = payloads.portfolio_by_date_data(comitente, date, moneda)
 
-        # Mapa de monedas para determinar el proceso
-        proceso_map = {"ARS": 10, "USD": 91}
+        with self.instrumentation.call('Portfolio.by_date', 'Consultas/GetConsulta'):
+            data = self.__get_consulta(payload)
 
-        # Validar que la moneda sea válida
-        if moneda not in proceso_map:
-            raise ValueError(f"Moneda '{moneda}' no válida.")
+            # Convertir la respuesta JSON en un DataFrame con los activos procesados
+            with timed('build'):
+                return parsers.parse_portfolio_by_date(data)
 
-        # Cargar los datos a consultar en un diccionario
-        payload = {
-            "comitente": str(comitente),
-            "consolida": "0",
-            "proceso": str(proceso_map.get(moneda)),
-            "fechaDesde": str(date),
-            "tipo": "00"
-        }
-
-        # Realizar la solicitud a la API
-        response = self.__s.post(f"https://{self.__host}/Consultas/GetConsulta", json=payload)
-        
-        # Verificar si la respuesta fue exitosa
-        if response.status_code != 200:
-            raise ValueError(f"Error al realizar la solicitud: {response.status_code}")
-        
-        # Convertir la respuesta JSON en un objeto Python
-        portfolio = response.json()
-
-        # Inicializar una lista para almacenar los activos procesados
-        activos = []
-
-        # Iterar sobre los activos obtenidos de la respuesta
-        for activo in portfolio['Result']['Activos']:
-            for subtotal in activo['Subtotal']:
-                # Crear un diccionario con los datos relevantes del activo y su subtotal
-                activo_data = {
-                    'symbol': subtotal['TICK'],
-                    'description': subtotal['AMPL'],
-                    'position_size': subtotal['CANT'],
-                    'position_price': subtotal['CAN0'],
-                    'date_close': subtotal['PCIO'],
-                    'position': subtotal['IMPO'],                    
-                    'PNL': subtotal['GTOS'],
-                    'group': activo['ESPE'],                    
-                }
-                # Agregar los datos procesados del activo a la lista
-                activos.append(activo_data)
-
-        # Convertir la lista de activos en un DataFrame de pandas
-        activos_df=pd.DataFrame(activos)
-
-        tenencia_disponible = next(
-                (item["IMPO"] for item in portfolio["Result"]["Activos"] if item["ESPE"] == "Cuenta Corriente"),
-                None
-            )
-
-        activos_df.loc[activos_df['group'] == 'Cuenta Corriente', 'position'] = tenencia_disponible
-        activos_df.loc[activos_df['group'] == 'Cuenta Corriente', 'description'] = "Liquidez"
-        # Retornar el DataFrame con los datos procesados
-        return activos_df
+    def by_date_many(self, comitentes, date, monedas=("ARS",), max_workers=8):
+        """
+        Obtiene los activos de varios comitentes en una fecha, consultando en paralelo
+        cada combinación de comitente y moneda con a lo sumo max_workers solicitudes simultáneas.
+
+        Parámetros:
+            comitentes (list): IDs de los comitentes.
+            date (str): Fecha en formato "YYYY-MM-DD" para la consulta.
+            monedas (list): Monedas a consultar ("ARS", "USD" o ambas).
+            max_workers (int): Cantidad máxima de solicitudes en paralelo.
+
+        Retorna:
+            pd.DataFrame: DataFrame indexado por comitente, con la columna moneda.
+        """
+
+        jobs = [(comitente, moneda) for comitente in comitentes for moneda in monedas]
+        if not jobs:
+            return parsers.concat_by_comitente([], [])
+
+        # Validar antes de lanzar las consultas
+        for moneda in monedas:
+            payloads.portfolio_by_date_data(jobs[0][0], date, moneda)
+
+        with self.instrumentation.call('Portfolio.by_date_many', 'Consultas/GetConsulta'):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+                frames = list(executor.map(bind(lambda job: self.by_date(job[0], date, job[1]).assign(moneda=job[1])), jobs))
+
+            with timed('build'):
+                return parsers.concat_by_comitente(frames, [comitente for comitente, _ in jobs])
+
+    def by_range(self, comitente, start, end, moneda="ARS", max_workers=8, holidays=()):
+        """
+        Obtiene los activos de un comitente en cada día hábil entre start y end inclusive,
+        consultando en paralelo con a lo sumo max_workers solicitudes simultáneas.
+        Las fechas cerradas (anteriores a hoy) se leen de holdings_store si ya fueron
+        consultadas, y las nuevas se guardan en él.
+
+        Parámetros:
+            comitente (str): ID del comitente.
+            start (str o date): Primera fecha, en formato "YYYY-MM-DD" si es texto.
+            end (str o date): Última fecha, en formato "YYYY-MM-DD" si es texto.
+            moneda (str): Moneda en la que se requiere obtener los activos ("ARS" o "USD").
+            max_workers (int): Cantidad máxima de solicitudes en paralelo.
+            holidays (list): Feriados a omitir además de los fines de semana.
+
+        Retorna:
+            pd.DataFrame: DataFrame indexado por fecha y símbolo.
+
+        Lanza:
+            ValueError: Si la moneda no es válida o si las fechas no tienen el formato esperado.
+        """
+
+        dates = _business_days(start, end, holidays)
+        # Validar la moneda antes de lanzar las consultas
+        payloads.portfolio_by_date_data(comitente, _to_date(start).isoformat(), moneda)
+
+        with self.instrumentation.call('Portfolio.by_range', 'Consultas/GetConsulta'):
+            responses = self.holdings_store.load(comitente, moneda, dates) if self.holdings_store is not None else {}
+            missing = [date for date in dates if date not in responses]
+
+            if missing:
+                fetch = bind(lambda date: self.__get_consulta(payloads.portfolio_by_date_data(comitente, date.isoformat(), moneda)))
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+                    fetched = dict(zip(missing, executor.map(fetch, missing)))
+                if self.holdings_store is not None:
+                    self.holdings_store.save(comitente, moneda, fetched)
+                responses.update(fetched)
+
+            with timed('build'):
+                return parsers.concat_by_date([parsers.parse_portfolio_by_date(responses[date]) for date in dates], dates)
+
+    def __get_consulta(self, payload):
+        # Realizar la solicitud a la API, la consulta no modifica nada y se puede reintentar
+        return decode(self.__t.post(f"{self.__url}/Consultas/GetConsulta", json=payload, idempotent=True))
+
+def _to_date(value):
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"La fecha '{value}' no tiene el formato correcto (YYYY-MM-DD).")
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+def _business_days(start, end, holidays=()):
+    start, end = _to_date(start), _to_date(end)
+    holidays = {_to_date(holiday) for holiday in holidays}
+    days = (start + datetime.timedelta(days=i) for i in range((end - start).days + 1))
+    return [day for day in days if day.weekday() < 5 and day not in holidays]
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for SHDA.common.helpers.convert_to_numeric_columns.
+
+Builds synthetic GetByPanel-like frames (13 numeric columns, Argentine
+formatted strings, '-' for missing values and some already typed columns)
+and compares the vectorized conversion against the previous per element
+implementation.
+
+    python -m benchmarks.bench_convert_numeric
+    python -m benchmarks.bench_convert_numeric --rows 1000 10000 50000 --repeat 5
+"""
+import argparse
+import random
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from SHDA.common import maps
+from SHDA.common.helpers import convert_to_numeric_columns
+
+
+def legacy_convert_to_numeric_columns(df, columns):
+
+    for col in columns:
+        df[col] = df[col].apply(lambda x: x.replace('.', '').replace(',','.') if isinstance(x, str) else x)
+        df[col] = pd.to_numeric(df[col].apply(lambda x: np.nan if x == '-' else x))
+
+    return df
+
+def argentine_number(value):
+    integer, decimals = '{:.2f}'.format(value).split('.')
+    return '{:,}'.format(int(integer)).replace(',', '.') + ',' + decimals
+
+def make_panel(rows, seed=0):
+    rnd = random.Random(seed)
+    data = {}
+    for i, col in enumerate(maps.numeric_columns):
+        if i % 4 == 3:
+            # Some brokers already send typed numbers for a few columns
+            data[col] = [rnd.uniform(0, 1e6) for _ in range(rows)]
+        else:
+            data[col] = ['-' if rnd.random() < 0.1 else argentine_number(rnd.uniform(0, 1e6)) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+def bench(function, df, repeat):
+    timer = timeit.Timer(lambda: function(df.copy(), maps.numeric_columns))
+    return min(timer.repeat(repeat=repeat, number=1))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>12} {:>8}'.format('rows', 'legacy ms', 'vector ms', 'speedup'))
+    for rows in args.rows:
+        df = make_panel(rows)
+        pd.testing.assert_frame_equal(
+            legacy_convert_to_numeric_columns(df.copy(), maps.numeric_columns),
+            convert_to_numeric_columns(df.copy(), maps.numeric_columns))
+
+        legacy = bench(legacy_convert_to_numeric_columns, df, args.repeat)
+        vector = bench(convert_to_numeric_columns, df, args.repeat)
+        print('{:>8} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(rows, legacy * 1e3, vector * 1e3, legacy / vector))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Import-time budget for `import SHDA`.
+
+Runs `python -X importtime -c "import SHDA"` in fresh interpreters, reports
+the median cumulative import time of the package and its heaviest modules,
+and exits with status 1 when the budget is exceeded or when a heavy
+dependency is imported eagerly.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --budget 60 --runs 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'lxml', 'pyquery', 'aiohttp', 'pyarrow')
+
+
+def import_times(statement):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], env=env, capture_output=True, text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='SHDA')
+    parser.add_argument('--budget', type=float, default=100, help='maximum median cumulative import time in ms')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='heaviest modules to list')
+    args = parser.parse_args()
+
+    # The first run also writes the .pyc files, it is not measured
+    import_times('import ' + args.module)
+    runs = [import_times('import ' + args.module) for _ in range(args.runs)]
+
+    total = statistics.median(run[args.module][1] for run in runs) / 1e3
+    last = runs[-1]
+    print('{:<48} {:>10} {:>12}'.format('module', 'self ms', 'cumulative ms'))
+    for name, (own, cumulative) in sorted(last.items(), key=lambda item: item[1][0], reverse=True)[:args.top]:
+        print('{:<48} {:>10.2f} {:>12.2f}'.format(name, own / 1e3, cumulative / 1e3))
+    print('\nimport {}: {:.2f} ms median over {} runs (budget {:.0f} ms)'.format(args.module, total, args.runs, args.budget))
+
+    heavy = [name for name in HEAVY_MODULES if name in last]
+    if heavy:
+        print('Imported eagerly: {}'.format(', '.join(heavy)))
+    if heavy or total > args.budget:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Offline benchmark suite for SHDA.
+
+Starts benchmarks.stub_broker.StubBroker on a free local port, logs in with
+SHDA against it and reports latency (mean, p50, p95), throughput and peak
+Python memory for every public SHDA method and for the Portfolio ones. No
+broker access is needed, so two versions can be compared on the same
+machine:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --rows 5000 --iterations 20 --json before.json
+    python -m benchmarks.run_benchmarks --only get_galpones get_options
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+import tracemalloc
+
+import pandas as pd
+
+import SHDA
+from SHDA.analytics import CashflowTable
+from SHDA.common import Transport
+
+from .stub_broker import StubBroker
+
+
+def bond_cashflows(bonds):
+    # Semiannual 8% coupons and a bullet amortization for the first bonds
+    # of the stub rentaFija board, with past coupons so there is accrued
+    dates = [datetime.date(year, month, 15) for year in range(2023, 2031) for month in (1, 7)]
+    return CashflowTable(pd.DataFrame([('RENT{:05d}'.format(i), date, 4.0, 100.0 if date == dates[-1] else 0.0) for i in range(bonds) for date in dates],
+                                      columns=CashflowTable.columns))
+
+def cases(hb, args):
+    comitentes = list(range(1, args.accounts + 1))
+    symbols = ['SYM{:03d}'.format(i) for i in range(args.symbols)]
+    cashflows = bond_cashflows(min(args.rows, 200))
+    today = datetime.date(2024, 6, 14)
+    return {
+        'get_bluechips': lambda: hb.get_bluechips('48hs'),
+        'get_galpones': lambda: hb.get_galpones('48hs'),
+        'get_galpones[records]': lambda: hb.get_galpones('48hs', backend='records'),
+        'get_cedear': lambda: hb.get_cedear('48hs'),
+        'get_bonds': lambda: hb.get_bonds('48hs'),
+        'get_short_term_bonds': lambda: hb.get_short_term_bonds('48hs'),
+        'get_corporate_bonds': lambda: hb.get_corporate_bonds('48hs'),
+        'get_options': lambda: hb.get_options(),
+        'get_MERVAL': lambda: hb.get_MERVAL(),
+        'get_personal_portfolio': lambda: hb.get_personal_portfolio(),
+        'get_repos': lambda: hb.get_repos(),
+        'get_repo_curve': lambda: hb.get_repo_curve().nodes(),
+        'get_option_analytics': lambda: hb.get_option_analytics(0.3, now=datetime.datetime(2024, 6, 14, 12)),
+        'get_bond_analytics': lambda: hb.get_bond_analytics(cashflows, '48hs', today=today),
+        'get_market_snapshot': lambda: hb.get_market_snapshot('48hs'),
+        'get_quotes': lambda: hb.get_quotes(['PANE00010', 'ACCI00003', 'CEDE00007', 'RENT00001', 'LETE00002'], '48hs'),
+        'account': lambda: hb.account(1),
+        'iter_account': lambda: list(hb.iter_account(1)),
+        'accounts': lambda: hb.accounts(comitentes),
+        'get_daily_history': lambda: hb.get_daily_history('AL30', '2020-01-01', '2024-06-14'),
+        'get_daily_history_many': lambda: hb.get_daily_history_many(symbols, '2020-01-01', '2024-06-14'),
+        # Whole minute series against the bars since the last one already fetched
+        'get_intraday_history': lambda: hb.get_intraday_history('AL30', 1, since=0, max_age=0),
+        'get_intraday_history[since_last]': lambda: hb.get_intraday_history('GD30', 1, max_age=0),
+        'Portfolio.by_date': lambda: hb.get_portfolio.by_date(1, '2024-06-14', 'ARS'),
+        'Portfolio.by_date_many': lambda: hb.get_portfolio.by_date_many(comitentes, '2024-06-14', ['ARS', 'USD']),
+        'Portfolio.by_range': lambda: hb.get_portfolio.by_range(1, '2024-06-03', '2024-06-14'),
+    }
+
+def measure(function, iterations, warmup):
+
+    for _ in range(warmup):
+        function()
+
+    latencies = []
+    rows = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = function()
+        latencies.append(time.perf_counter() - started)
+        rows += len(result)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'mean_ms': statistics.mean(latencies) * 1e3,
+        'p50_ms': latencies[len(latencies) // 2] * 1e3,
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1e3,
+        'calls_per_s': iterations / total,
+        'rows_per_s': rows / total,
+        'peak_mib': peak / 2 ** 20,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000, help='rows per GetByPanel board')
+    parser.add_argument('--favorites', type=int, default=50)
+    parser.add_argument('--groups', type=int, default=10, help='asset groups per account')
+    parser.add_argument('--positions', type=int, default=20, help='positions per asset group')
+    parser.add_argument('--bars', type=int, default=1000, help='bars per history request')
+    parser.add_argument('--accounts', type=int, default=10, help='comitentes for the bulk account calls')
+    parser.add_argument('--symbols', type=int, default=20, help='symbols for get_daily_history_many')
+    parser.add_argument('--latency', type=float, default=0, help='seconds the stub waits before every response')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--only', nargs='+', help='run only these cases')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    with StubBroker(rows=args.rows, favorites=args.favorites, groups=args.groups, positions=args.positions, bars=args.bars, latency=args.latency) as stub:
+        hb = SHDA.SHDA(stub.broker, 'dni', 'user', 'password', transport=Transport(retries=0))
+
+        results = {}
+        print('{:<34} {:>10} {:>10} {:>10} {:>10} {:>12} {:>9}'.format('case', 'mean ms', 'p50 ms', 'p95 ms', 'calls/s', 'rows/s', 'peak MiB'))
+        for name, function in cases(hb, args).items():
+            if args.only and name not in args.only:
+                continue
+            result = results[name] = measure(function, args.iterations, args.warmup)
+            print('{:<34} {mean_ms:>10.2f} {p50_ms:>10.2f} {p95_ms:>10.2f} {calls_per_s:>10.1f} {rows_per_s:>12.0f} {peak_mib:>9.2f}'.format(name, **result))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'version': SHDA.__version__, 'args': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+Local HTTP stand-in for a Home Broker site.
+
+Implements the endpoints SHDA talks to and serves synthetic payloads with the
+same shapes the parsers expect (Result.Stocks, Result.Activos[].Subtotal and
+the t/o/h/l/c/v history arrays). Sizes are configurable, and every payload is
+serialized once up front so the stub adds as little noise as possible to the
+measurements. Like the real site, data requests without a valid session
+cookie are redirected to the login page.
+
+    python -m benchmarks.stub_broker --port 8080 --rows 2000
+
+    hb = SHDA.SHDA({'page': '127.0.0.1:8080', 'scheme': 'http'}, dni, user, password)
+"""
+import argparse
+import bisect
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+LOGGED_IN_PAGE = b'<html><body><div id="usuarioLogueado">stub</div></body></html>'
+HOME_PAGE = b'<html><body>stub broker</body></html>'
+
+SETTLED_PANELS = ['accionesLideres', 'panelGeneral', 'cedears', 'rentaFija', 'letes', 'obligaciones']
+
+
+def argentine_number(value, decimals=2):
+    integer, fraction = '{:.{}f}'.format(value, decimals).split('.')
+    return '{:,}'.format(int(integer)).replace(',', '.') + ',' + fraction
+
+def make_stock(rnd, symbol, panel, term, option=False):
+    price = rnd.uniform(10, 50000)
+    traded = rnd.random() > 0.1
+    return {
+        'Symbol': symbol,
+        'Term': term,
+        'BuyQuantity': str(rnd.randint(1, 100000)),
+        'BuyPrice': argentine_number(price * 0.999),
+        'SellPrice': argentine_number(price * 1.001),
+        'SellQuantity': str(rnd.randint(1, 100000)),
+        'LastPrice': argentine_number(price) if traded else '-',
+        'VariationRate': argentine_number(rnd.uniform(-5, 5)),
+        'StartPrice': argentine_number(price * 0.99),
+        'MaxPrice': argentine_number(price * 1.02),
+        'MinPrice': argentine_number(price * 0.98),
+        'PreviousClose': argentine_number(price * 0.995),
+        'ClosePrice': argentine_number(price),
+        'TotalAmountTraded': argentine_number(rnd.uniform(0, 1e9)),
+        'TotalQuantityTraded': str(rnd.randint(0, 1000000)),
+        'Trades': str(rnd.randint(0, 5000)),
+        'TradeDate': '20240614',
+        'Hour': '{:02d}:{:02d}:{:02d}'.format(rnd.randint(11, 16), rnd.randint(0, 59), rnd.randint(0, 59)),
+        'Panel': panel,
+        'MaturityDate': '20241220' if option else '',
+        'StrikePrice': round(rnd.uniform(500, 5000), 1) if option else 0,
+        'PutOrCall': rnd.choice([1, 2]) if option else 0,
+        'Issuer': 'GGAL' if option else '',
+        'CantDias': str(rnd.randint(1, 30)),
+    }
+
+def make_panel(panel, term, rows, seed=0):
+    rnd = random.Random('{}{}{}'.format(panel, term, seed))
+    option = panel == 'opciones'
+    stocks = [make_stock(rnd, '{}{:05d}'.format(panel[:4].upper(), i), panel, term, option) for i in range(rows)]
+    if panel == 'accionesLideres' and stocks:
+        # Underlying of the options board, so the option analytics have a spot
+        stocks[0]['Symbol'] = 'GGAL'
+    return {'Result': {'Stocks': stocks}}
+
+def make_favorites(rows, seed=0):
+    rnd = random.Random(seed)
+    return {'Result': [make_stock(rnd, 'FAV{:05d}'.format(i), 'opciones' if i % 2 else 'rentaFija', str(rnd.randint(1, 3)), option=bool(i % 2)) for i in range(rows)]}
+
+def make_holdings(groups, positions, seed=0):
+    rnd = random.Random(seed)
+    activos = [{'ESPE': 'Cuenta Corriente', 'IMPO': round(rnd.uniform(0, 1e7), 2),
+                'Subtotal': [{'TICK': '', 'AMPL': 'Pesos', 'CANT': 0, 'CAN0': 0, 'PCIO': 0, 'IMPO': 0, 'GTOS': 0}]}]
+    for group in range(groups):
+        subtotal = []
+        for position in range(positions):
+            size = rnd.randint(1, 100000)
+            price = round(rnd.uniform(10, 50000), 2)
+            subtotal.append({'TICK': 'SYM{:03d}{:03d}'.format(group, position), 'AMPL': 'Instrument {} {}'.format(group, position),
+                             'CANT': size, 'CAN0': price, 'PCIO': price, 'IMPO': round(size * price, 2), 'GTOS': round(rnd.uniform(-1e5, 1e5), 2)})
+        activos.append({'ESPE': 'Group {}'.format(group), 'IMPO': round(sum(item['IMPO'] for item in subtotal), 2), 'Subtotal': subtotal})
+    return {'Result': {'Activos': activos}}
+
+def make_history(bars, resolution='D', seed=0, start=1700000000):
+    rnd = random.Random(seed)
+    step = 86400 if resolution == 'D' else 60 * int(resolution)
+    closes, price = [], 1000.0
+    for _ in range(bars):
+        price *= 1 + rnd.uniform(-0.02, 0.02)
+        closes.append(round(price, 2))
+    return {'s': 'ok', 't': [start + i * step for i in range(bars)], 'o': closes, 'h': [c * 1.01 for c in closes],
+            'l': [c * 0.99 for c in closes], 'c': closes, 'v': [rnd.randint(0, 10 ** 6) for _ in range(bars)]}
+
+class StubBroker:
+    """
+    Threaded stub server. rows sets the size of every GetByPanel board,
+    favorites the GetFavoritos rows, groups/positions the GetConsulta
+    holdings and bars the history length.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, rows=1000, favorites=50, groups=10, positions=20, bars=1000, latency=0):
+        self.latency = latency
+        self.__panels = {}
+        for panel in SETTLED_PANELS:
+            for term in ('1', '2', '3'):
+                self.__panels[(panel, term)] = json.dumps(make_panel(panel, term, rows)).encode()
+        for panel in ('opciones', 'indices', 'cauciones'):
+            self.__panels[(panel, '')] = json.dumps(make_panel(panel, '', rows)).encode()
+        self.__empty_panel = json.dumps({'Result': {'Stocks': []}}).encode()
+        self.__favorites = json.dumps(make_favorites(favorites)).encode()
+        self.__holdings = json.dumps(make_holdings(groups, positions)).encode()
+        self.__history = {}
+        self.__bars = bars
+        self.__sessions = set()
+        self.requests = 0
+        self.logins = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == '/HistoricoPrecios/history':
+                    if self.authorized():
+                        query = parse_qs(url.query)
+                        self.reply(stub.history(query.get('resolution', ['D'])[0], query.get('from', [None])[0], query.get('to', [None])[0]))
+                elif url.path.startswith('/Login'):
+                    self.reply(HOME_PAGE, 'text/html')
+                else:
+                    self.reply(LOGGED_IN_PAGE if stub.valid(self.session()) else HOME_PAGE, 'text/html')
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+                path = urlparse(self.path).path
+                if path == '/Login/Ingresar':
+                    self.reply(LOGGED_IN_PAGE, 'text/html', headers={'Set-Cookie': 'session={}; Path=/; HttpOnly'.format(stub.login())})
+                elif not self.authorized():
+                    pass
+                elif path == '/Prices/GetByPanel':
+                    query = json.loads(body or b'{}')
+                    self.reply(stub.panel(query.get('panel', ''), query.get('term', '')))
+                elif path == '/Prices/GetFavoritos':
+                    self.reply(stub.favorites())
+                elif path == '/Consultas/GetConsulta':
+                    self.reply(stub.holdings())
+                else:
+                    self.reply(b'{}', status=404)
+
+            def session(self):
+                cookie = SimpleCookie(self.headers.get('Cookie', ''))
+                return cookie['session'].value if 'session' in cookie else None
+
+            def authorized(self):
+                if stub.valid(self.session()):
+                    return True
+                self.reply(b'', 'text/html', status=302, headers={'Location': '/Login'})
+                return False
+
+            def reply(self, payload, content_type='application/json', status=200, headers=None):
+                stub.requests += 1
+                if stub.latency:
+                    threading.Event().wait(stub.latency)
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def broker(self):
+        host, port = self.server.server_address[:2]
+        return {'broker_id': 0, 'name': 'Stub broker', 'page': '{}:{}'.format(host, port), 'scheme': 'http'}
+
+    def login(self):
+        token = secrets.token_hex(16)
+        self.__sessions.add(token)
+        self.logins += 1
+        return token
+
+    def valid(self, token):
+        return token in self.__sessions
+
+    def expire_sessions(self):
+        """Invalidates every session, as the broker does after a while."""
+        self.__sessions.clear()
+
+    def panel(self, panel, term):
+        return self.__panels.get((panel, term), self.__empty_panel)
+
+    def favorites(self):
+        return self.__favorites
+
+    def holdings(self):
+        return self.__holdings
+
+    def history(self, resolution, start=None, end=None):
+        if resolution == 'D':
+            if resolution not in self.__history:
+                self.__history[resolution] = json.dumps(make_history(self.__bars, resolution)).encode()
+            return self.__history[resolution]
+
+        # Minute bars end at the time of the first request and are filtered
+        # by from/to, so incremental requests get only the bars they ask for
+        if resolution not in self.__history:
+            step = 60 * int(resolution)
+            last = int(time.time()) // step * step
+            self.__history[resolution] = make_history(self.__bars, resolution, start=last - (self.__bars - 1) * step)
+        data = self.__history[resolution]
+        low = bisect.bisect_left(data['t'], int(start)) if start is not None else 0
+        high = bisect.bisect_right(data['t'], int(end)) if end is not None else len(data['t'])
+        if low >= high:
+            return json.dumps({'s': 'no_data'}).encode()
+        return json.dumps({name: values[low:high] if isinstance(values, list) else values for name, values in data.items()}).encode()
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--favorites', type=int, default=50)
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--positions', type=int, default=20)
+    parser.add_argument('--bars', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0, help='seconds added to every response')
+    args = parser.parse_args()
+
+    stub = StubBroker(args.host, args.port, args.rows, args.favorites, args.groups, args.positions, args.bars, args.latency)
+    print('Stub broker listening on', stub.broker)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == '__main__':
+    main()
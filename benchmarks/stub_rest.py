@@ -0,0 +1,75 @@
+"""
+Local HTTP stand-in for a PostgREST/Supabase table, for the collector.
+
+Accepts POST /rest/v1/<table>?on_conflict=a,b with a JSON array and merges
+the rows in memory by the on_conflict columns, like Prefer:
+resolution=merge-duplicates does on the real service.
+
+    with StubRest() as rest:
+        sink = RestSink(rest.url, 'quotes')
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubRest:
+
+    def __init__(self, host='127.0.0.1', port=0, fail=0):
+        self.tables = {}
+        self.requests = 0
+        self.fail = fail
+        self.__lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+                url = urlparse(self.path)
+                table = url.path.rsplit('/', 1)[-1]
+                key = parse_qs(url.query).get('on_conflict', [''])[0].split(',')
+                status = stub.upsert(table, key, json.loads(body or b'[]'))
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://{}:{}/rest/v1'.format(host, port)
+
+    def upsert(self, table, key, rows):
+        with self.__lock:
+            self.requests += 1
+            # The first fail requests answer 503, to exercise the retries
+            if self.fail:
+                self.fail -= 1
+                return 503
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                stored[tuple(row.get(name) for name in key)] = row
+        return 201
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
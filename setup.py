@@ -59,5 +59,12 @@ setup(
     ],
     platforms=['any'],
     keywords='pandas, BYMA, online, downloader, finance',
-    packages=find_packages(exclude=['contrib', 'docs', 'tests', 'examples']),
+    packages=find_packages(exclude=['contrib', 'docs', 'tests', 'examples', 'benchmarks', 'benchmarks.*']),
+    extras_require={
+        'async': ['aiohttp'],
+        'parquet': ['pyarrow'],
+        'arrow': ['pyarrow'],
+        'polars': ['polars', 'pyarrow'],
+        'keyring': ['keyring'],
+    },
 )